@@ -0,0 +1,100 @@
+"""
+Benchmark how parsing harvested OAI-PMH pages scales with worker processes.
+
+Pages are synthesized by repeating the records in
+``data/lisa7-posters_oai_datacite3.xml``, so no network access is needed.
+
+Usage::
+
+   python benchmarks/parse_scaling.py --pages 200 --records 50
+
+For each process count, the script reports the wall-clock time to build a
+:class:`~zenodio.harvest.Datacite3Collection` with
+:meth:`~zenodio.harvest.Datacite3Collection.from_pages`, and the speedup over
+parsing serially in this process. It then repeats the benchmark for a single
+large page, which is split into byte ranges of records.
+"""
+
+import argparse
+import os
+import re
+import time
+
+from zenodio.harvest import Datacite3Collection
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data',
+                         'lisa7-posters_oai_datacite3.xml')
+
+
+def make_page(xml_content, n_records):
+    """Build an OAI-PMH page with ``n_records`` records from a sample page.
+    """
+    records = re.findall(b'<record>.*?</record>', xml_content, re.S)
+    head = xml_content[:xml_content.index(b'<record>')]
+    body = b''.join(records[i % len(records)] for i in range(n_records))
+    return head + body + b'</ListRecords></OAI-PMH>'
+
+
+def time_parse(pages, processes, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        collection = Datacite3Collection.from_pages(pages,
+                                                    processes=processes)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    n_records = sum(1 for _ in collection.records())
+    return best, n_records
+
+
+def run(title, pages, process_counts, repeat):
+    print(title)
+    print('{0:>10} {1:>10} {2:>12} {3:>8}'.format(
+        'processes', 'seconds', 'records/s', 'speedup'))
+    baseline = None
+    for processes in process_counts:
+        elapsed, n_records = time_parse(pages, processes, repeat)
+        if baseline is None:
+            baseline = elapsed
+        print('{0:>10} {1:>10.3f} {2:>12.0f} {3:>8.2f}'.format(
+            'serial' if processes is None else processes,
+            elapsed, n_records / elapsed, baseline / elapsed))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--pages', type=int, default=100,
+                        help='Number of pages (default: %(default)s)')
+    parser.add_argument('--records', type=int, default=50,
+                        help='Records per page (default: %(default)s)')
+    parser.add_argument('--max-processes', type=int, default=os.cpu_count(),
+                        help='Largest process count (default: CPU count)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Repetitions; the best time is reported '
+                             '(default: %(default)s)')
+    args = parser.parse_args()
+
+    with open(DATA_PATH, 'rb') as f:
+        sample = f.read()
+
+    process_counts = [None]
+    n = 1
+    while n <= args.max_processes:
+        process_counts.append(n)
+        n *= 2
+    if process_counts[-1] != args.max_processes:
+        process_counts.append(args.max_processes)
+
+    page = make_page(sample, args.records)
+    run('{0} pages x {1} records'.format(args.pages, args.records),
+        [page] * args.pages, process_counts, args.repeat)
+
+    big_page = make_page(sample, args.pages * args.records)
+    run('1 page x {0} records'.format(args.pages * args.records),
+        [big_page], process_counts, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
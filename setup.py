@@ -38,6 +38,7 @@ setup(
     keywords='aas',
     packages=find_packages(exclude=['docs', 'tests*', 'data', 'notebooks']),
     install_requires=['future', 'requests', 'xmltodict'],
+    extras_require={'zstd': ['zstandard']},
     tests_require=['pytest'],
     # package_data={},
 )
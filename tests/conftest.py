@@ -0,0 +1,10 @@
+import pkg_resources
+import pytest
+
+
+@pytest.fixture
+def lisa7_posters_xml():
+    resource_args = (__name__, '../data/lisa7-posters_oai_datacite3.xml')
+    assert pkg_resources.resource_exists(*resource_args)
+    xml_data = pkg_resources.resource_string(*resource_args)
+    return xml_data
@@ -0,0 +1,228 @@
+import concurrent.futures
+import os
+import re
+import threading
+
+import pytest
+
+import zenodio.archive
+import zenodio.harvest
+from zenodio.archive import PageArchive
+from zenodio.harvest import (harvest_collection, resumption_token,
+                             response_date)
+
+
+def _last_page(xml_data):
+    """Remove the resumptionToken from a ListRecords page."""
+    return re.sub(b'<resumptionToken[^>]*>[^<]*</resumptionToken>', b'',
+                  xml_data)
+
+
+class FakeResponse(object):
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+def test_page_metadata(lisa7_posters_xml):
+    assert response_date(lisa7_posters_xml) == '2015-12-19T19:06:30Z'
+    assert resumption_token(lisa7_posters_xml) == \
+        'user-lisa7-posters___DqqFqu'
+    assert resumption_token(_last_page(lisa7_posters_xml)) is None
+
+
+def test_archive_roundtrip(tmpdir, lisa7_posters_xml):
+    archive = PageArchive(str(tmpdir))
+    first = archive.append(lisa7_posters_xml, 'lisa7-posters',
+                           'oai_datacite3', harvest_id='h1')
+    second = archive.append(lisa7_posters_xml, 'lisa7-posters',
+                            'oai_datacite3', resumption_token='abc',
+                            harvest_id='h1')
+    assert first.page == 0
+    assert second.page == 1
+    assert second.offset == first.offset + first.length
+    assert first.length < len(lisa7_posters_xml)
+    assert first.datestamp == '2015-12-19T19:06:30Z'
+
+    # A new PageArchive reads the same index from disk
+    entries = PageArchive(str(tmpdir)).entries(community_name='lisa7-posters')
+    assert entries == [first, second]
+    assert archive.read(second) == lisa7_posters_xml
+    assert archive.entries(community_name='lsst-dm') == []
+
+
+def test_archive_uncompressed(tmpdir, lisa7_posters_xml):
+    archive = PageArchive(str(tmpdir), compression=None)
+    entry = archive.append(lisa7_posters_xml, 'lisa7-posters',
+                           'oai_datacite3')
+    assert entry.length == len(lisa7_posters_xml)
+    assert list(archive.pages()) == [lisa7_posters_xml]
+
+
+def test_archive_zstd(tmpdir, lisa7_posters_xml):
+    pytest.importorskip('zstandard')
+    archive = PageArchive(str(tmpdir), compression='zstd')
+    entry = archive.append(lisa7_posters_xml, 'lisa7-posters',
+                           'oai_datacite3')
+    assert archive.read(entry) == lisa7_posters_xml
+
+
+def test_archive_unknown_compression(tmpdir):
+    with pytest.raises(ValueError):
+        PageArchive(str(tmpdir), compression='lzma')
+
+
+def test_replay_latest_harvest(tmpdir, lisa7_posters_xml):
+    archive = PageArchive(str(tmpdir))
+    archive.append(_last_page(lisa7_posters_xml), 'lisa7-posters',
+                   'oai_datacite3', harvest_id='old')
+    archive.append(lisa7_posters_xml, 'lisa7-posters', 'oai_datacite3',
+                   harvest_id='new')
+    archive.append(_last_page(lisa7_posters_xml), 'lisa7-posters',
+                   'oai_datacite3', resumption_token='abc', harvest_id='new')
+
+    n_records = len(list(zenodio.harvest.Datacite3Collection
+                         .from_collection_xml(lisa7_posters_xml).records()))
+    serial = archive.replay('lisa7-posters')
+    assert len(list(serial.records())) == 2 * n_records
+
+    parallel = archive.replay('lisa7-posters', processes=2)
+    assert [r.doi for r in parallel.records()] == \
+        [r.doi for r in serial.records()]
+
+    old = archive.replay('lisa7-posters', harvest_id='old')
+    assert len(list(old.records())) == n_records
+
+    with pytest.raises(KeyError):
+        archive.replay('lsst-dm')
+
+
+def test_replay_skips_incomplete_harvest(tmpdir, lisa7_posters_xml):
+    archive = PageArchive(str(tmpdir))
+    archive.append(_last_page(lisa7_posters_xml), 'lisa7-posters',
+                   'oai_datacite3', harvest_id='complete')
+    # A harvest that failed after its first page
+    first = archive.append(lisa7_posters_xml, 'lisa7-posters',
+                           'oai_datacite3', harvest_id='failed')
+    assert not first.final
+
+    assert archive.latest_harvest_id('lisa7-posters') == 'complete'
+    assert archive.latest_harvest_id('lisa7-posters', complete=False) == \
+        'failed'
+    n_records = len(list(archive.replay('lisa7-posters').records()))
+    assert n_records == len(list(archive.replay(
+        'lisa7-posters', harvest_id='failed').records()))
+
+    archive.append(lisa7_posters_xml, 'lsst-dm', 'oai_datacite3')
+    with pytest.raises(KeyError):
+        archive.replay('lsst-dm')
+
+
+def test_harvest_failure_not_replayed(monkeypatch, tmpdir,
+                                      lisa7_posters_xml):
+    def fake_get(url):
+        if 'resumptionToken' in url:
+            raise RuntimeError('Zenodo is down')
+        return FakeResponse(lisa7_posters_xml)
+
+    monkeypatch.setattr(zenodio.harvest.requests, 'get', fake_get)
+    archive = PageArchive(str(tmpdir))
+    with pytest.raises(RuntimeError):
+        harvest_collection('lisa7-posters', archive=archive)
+    assert len(archive.entries()) == 1
+    with pytest.raises(KeyError):
+        archive.replay('lisa7-posters')
+
+
+def _append_pages(path, xml_content, n_pages):
+    archive = PageArchive(path)
+    harvest_id = archive.new_harvest_id()
+    for _ in range(n_pages):
+        archive.append(xml_content, 'lisa7-posters', 'oai_datacite3',
+                       harvest_id=harvest_id)
+
+
+def test_archive_concurrent_processes(tmpdir, lisa7_posters_xml):
+    path = str(tmpdir)
+    with concurrent.futures.ProcessPoolExecutor(4) as executor:
+        futures = [executor.submit(_append_pages, path, lisa7_posters_xml, 10)
+                   for _ in range(4)]
+        for future in futures:
+            future.result()
+
+    archive = PageArchive(path)
+    entries = archive.entries()
+    assert len(entries) == 40
+    assert len(set(e.offset for e in entries)) == 40
+    assert all(archive.read(e) == lisa7_posters_xml for e in entries)
+
+
+def test_harvest_collection_archives_pages(monkeypatch, tmpdir,
+                                           lisa7_posters_xml):
+    pages = [lisa7_posters_xml, _last_page(lisa7_posters_xml)]
+    urls = []
+
+    def fake_get(url):
+        urls.append(url)
+        return FakeResponse(pages[len(urls) - 1])
+
+    monkeypatch.setattr(zenodio.harvest.requests, 'get', fake_get)
+    archive = PageArchive(str(tmpdir))
+    collection = harvest_collection('lisa7-posters', archive=archive)
+
+    assert len(urls) == 2
+    assert urls[1].endswith('resumptionToken=user-lisa7-posters___DqqFqu')
+    entries = archive.entries()
+    assert [e.resumption_token for e in entries] == \
+        [None, 'user-lisa7-posters___DqqFqu']
+    assert len(set(e.harvest_id for e in entries)) == 1
+
+    replayed = archive.replay('lisa7-posters')
+    assert [r.doi for r in replayed.records()] == \
+        [r.doi for r in collection.records()]
+
+
+def test_escaped_resumption_token(monkeypatch, lisa7_posters_xml):
+    first_page = re.sub(b'user-lisa7-posters___DqqFqu',
+                        b'a&amp;b=c&lt;d', lisa7_posters_xml)
+    assert resumption_token(first_page) == 'a&b=c<d'
+    assert resumption_token(first_page.replace(b'&amp;', b'&#38;')) == \
+        'a&b=c<d'
+
+    pages = [first_page, _last_page(lisa7_posters_xml)]
+    urls = []
+
+    def fake_get(url):
+        urls.append(url)
+        return FakeResponse(pages[len(urls) - 1])
+
+    monkeypatch.setattr(zenodio.harvest.requests, 'get', fake_get)
+    harvest_collection('lisa7-posters')
+    assert urls[1].endswith('resumptionToken=a%26b%3Dc%3Cd')
+
+
+@pytest.mark.skipif(zenodio.archive.fcntl is None,
+                    reason='requires fcntl.flock')
+def test_archive_append_waits_for_file_lock(tmpdir, lisa7_posters_xml):
+    fcntl = zenodio.archive.fcntl
+    archive = PageArchive(str(tmpdir))
+    archive.append(lisa7_posters_xml, 'lisa7-posters', 'oai_datacite3')
+    appended = threading.Event()
+
+    def append():
+        archive.append(lisa7_posters_xml, 'lisa7-posters', 'oai_datacite3')
+        appended.set()
+
+    # Another writer (a separate open file) holds the lock
+    with open(os.path.join(str(tmpdir), 'pages.dat'), 'ab') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        thread = threading.Thread(target=append)
+        thread.start()
+        assert not appended.wait(0.2)
+        f.write(b'written by another process')
+    thread.join()
+
+    entry = archive.entries()[-1]
+    assert archive.read(entry) == lisa7_posters_xml
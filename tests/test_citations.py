@@ -0,0 +1,161 @@
+import json
+
+import pytest
+import xmltodict
+
+from zenodio.harvest import Datacite3Collection, DublinCoreRecord
+from zenodio.citations import (CitationRenderer, _LRUCache,
+                               _citation_digest)
+
+
+@pytest.fixture
+def lisa7_collection(lisa7_posters_xml):
+    return Datacite3Collection.from_collection_xml(lisa7_posters_xml)
+
+
+def test_render_bibtex(lisa7_collection):
+    record = next(lisa7_collection.records())
+    bibtex = CitationRenderer().render(record, 'bibtex')
+    assert bibtex == (
+        '@misc{zenodo_10165,\n'
+        '  author = {Dietrich, Dianne},\n'
+        '  title = {{Adapting educational materials in data management '
+        'for Astronomy graduate students}},\n'
+        '  year = {2014},\n'
+        '  month = {may},\n'
+        '  doi = {10.5281/zenodo.10165},\n'
+        '}')
+
+
+def test_render_csl_json(lisa7_collection):
+    record = next(lisa7_collection.records())
+    item = json.loads(CitationRenderer().render(record, 'csl-json'))
+    assert item['DOI'] == '10.5281/zenodo.10165'
+    assert item['author'] == [{'family': 'Dietrich', 'given': 'Dianne'}]
+    assert item['issued'] == {'date-parts': [[2014, 5, 26]]}
+
+
+def test_render_html(lisa7_collection):
+    record = next(lisa7_collection.records())
+    snippet = CitationRenderer().render(record, 'html')
+    assert snippet.startswith('<span class="zenodio-citation">')
+    assert '(2014)' in snippet
+    assert 'href="https://doi.org/10.5281/zenodo.10165"' in snippet
+
+
+def test_render_unknown_format(lisa7_collection):
+    record = next(lisa7_collection.records())
+    with pytest.raises(ValueError):
+        CitationRenderer().render(record, 'ris')
+
+
+def test_render_memoized(lisa7_posters_xml, lisa7_collection):
+    renderer = CitationRenderer()
+    record = next(lisa7_collection.records())
+    first = renderer.render(record, 'bibtex')
+    assert renderer.cache_size == 1
+    # A new record object with the same content hits the cache
+    same_record = next(Datacite3Collection.from_collection_xml(
+        lisa7_posters_xml).records())
+    assert same_record is not record
+    assert renderer.render(same_record, 'bibtex') is first
+    renderer.render(record, 'html')
+    assert renderer.cache_size == 2
+
+
+def test_render_memoized_by_cited_fields(lisa7_posters_xml):
+    renderer = CitationRenderer()
+    record = next(Datacite3Collection.from_collection_xml(
+        lisa7_posters_xml).records())
+    first = renderer.render(record, 'bibtex')
+
+    # Fields that aren't cited don't affect the cache key
+    edited_xml = lisa7_posters_xml.replace(
+        b'<description descriptionType="Abstract">',
+        b'<description descriptionType="Abstract">Edited. ', 1)
+    edited = next(Datacite3Collection.from_collection_xml(
+        edited_xml).records())
+    assert edited.digest != record.digest
+    assert renderer.render(edited, 'bibtex') is first
+
+    # ... but the issue date's precision does
+    coarser_xml = lisa7_posters_xml.replace(
+        b'<date dateType="Issued">2014-05-26</date>',
+        b'<date dateType="Issued">2014</date>', 1)
+    coarser = next(Datacite3Collection.from_collection_xml(
+        coarser_xml).records())
+    assert 'month' not in renderer.render(coarser, 'bibtex')
+    assert renderer.cache_size == 2
+
+
+def test_render_collection_processes(lisa7_collection):
+    renderer = CitationRenderer()
+    serial = renderer.render_collection(lisa7_collection, 'csl-json')
+    assert len(serial) == len(list(lisa7_collection.records()))
+
+    renderer.clear()
+    parallel = renderer.render_collection(lisa7_collection, 'csl-json',
+                                          processes=2)
+    assert parallel == serial
+    assert renderer.cache_size == len(serial)
+
+
+def test_lru_cache_eviction():
+    cache = _LRUCache(2)
+    cache['a'] = 1
+    cache['b'] = 2
+    cache['a']
+    cache['c'] = 3
+    assert len(cache) == 2
+    with pytest.raises(KeyError):
+        cache['b']
+    assert cache['a'] == 1
+
+
+def test_render_without_doi():
+    xml_dict = xmltodict.parse("""<record><metadata>
+        <oai_dc:dc xmlns:dc="http://purl.org/dc/elements/1.1/"
+                   xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/">
+          <dc:creator>Sick, Jonathan</dc:creator>
+          <dc:identifier>https://zenodo.org/record/10165</dc:identifier>
+          <dc:title>No DOI here</dc:title>
+        </oai_dc:dc>
+        </metadata></record>""")['record']
+    record = DublinCoreRecord(xml_dict)
+    assert record.doi is None
+
+    renderer = CitationRenderer()
+    bibtex = renderer.render(record, 'bibtex')
+    assert bibtex.startswith('@misc{zenodio_')
+    assert 'doi' not in bibtex
+    item = json.loads(renderer.render(record, 'csl-json'))
+    assert item['id'] == _citation_digest(record)
+    assert 'DOI' not in item
+    assert 'doi.org' not in renderer.render(record, 'html')
+
+
+@pytest.mark.parametrize('date,month,date_parts', [
+    ('2014', None, [2014]),
+    ('2014-05', 'may', [2014, 5]),
+    ('2014-05-26', 'may', [2014, 5, 26]),
+])
+def test_render_date_precision(date, month, date_parts):
+    xml_dict = xmltodict.parse("""<record><metadata>
+        <oai_dc:dc xmlns:dc="http://purl.org/dc/elements/1.1/"
+                   xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/">
+          <dc:date>{0}</dc:date>
+          <dc:identifier>10.5281/zenodo.10165</dc:identifier>
+          <dc:title>Dated</dc:title>
+        </oai_dc:dc>
+        </metadata></record>""".format(date))['record']
+    record = DublinCoreRecord(xml_dict)
+
+    renderer = CitationRenderer()
+    bibtex = renderer.render(record, 'bibtex')
+    assert 'year = {2014}' in bibtex
+    if month is None:
+        assert 'month' not in bibtex
+    else:
+        assert 'month = {{{0}}}'.format(month) in bibtex
+    item = json.loads(renderer.render(record, 'csl-json'))
+    assert item['issued'] == {'date-parts': [date_parts]}
@@ -0,0 +1,226 @@
+import threading
+
+import pytest
+
+from zenodio.daemon import HarvestDaemon, HarvestMetrics, _SingleFlight
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_collection_harvests_once():
+    calls = []
+
+    def harvest(community_name):
+        calls.append(community_name)
+        return 'collection-' + community_name
+
+    daemon = HarvestDaemon(harvest_func=harvest)
+    assert daemon.get_collection('lsst-dm') == 'collection-lsst-dm'
+    assert daemon.get_collection('lsst-dm') == 'collection-lsst-dm'
+    assert calls == ['lsst-dm']
+    # Unregistered communities are registered so they stay fresh
+    assert daemon.communities == ['lsst-dm']
+    assert daemon.metrics()['lsst-dm'].harvest_count == 1
+    # ... with the next refresh an interval away, not immediately
+    assert daemon.run_pending() == []
+
+
+def test_initial_harvests_jittered():
+    clock = FakeClock()
+    daemon = HarvestDaemon(harvest_func=lambda c: c, default_interval=100.,
+                           jitter=0.1, clock=clock)
+    for i in range(50):
+        daemon.add_community('community-{0}'.format(i))
+    due_times = [due for due, _, _ in daemon._schedule]
+    assert all(0. <= due <= 10. for due in due_times)
+    assert len(set(due_times)) > 1
+    clock.now = 10.
+    assert len(daemon.run_pending()) == 50
+
+
+def test_run_pending_intervals():
+    clock = FakeClock()
+    calls = []
+
+    def harvest(community_name):
+        calls.append(community_name)
+        return community_name
+
+    daemon = HarvestDaemon(harvest_func=harvest, jitter=0., clock=clock)
+    daemon.add_community('lsst-dm', interval=10.)
+    daemon.add_community('lisa7-posters', interval=100.)
+
+    assert sorted(daemon.run_pending()) == ['lisa7-posters', 'lsst-dm']
+    assert daemon.run_pending() == []
+
+    clock.now = 10.
+    assert daemon.run_pending() == ['lsst-dm']
+
+    clock.now = 100.
+    assert sorted(daemon.run_pending()) == ['lisa7-posters', 'lsst-dm']
+    assert len(calls) == 5
+
+
+def test_remove_community():
+    clock = FakeClock()
+    daemon = HarvestDaemon(harvest_func=lambda c: c, jitter=0., clock=clock)
+    daemon.add_community('lsst-dm', interval=10.)
+    daemon.run_pending()
+    daemon.remove_community('lsst-dm')
+    clock.now = 10.
+    assert daemon.run_pending() == []
+    assert daemon.communities == []
+
+
+def test_remove_and_readd_community():
+    clock = FakeClock()
+    calls = []
+
+    def harvest(community_name):
+        calls.append(community_name)
+        return community_name
+
+    daemon = HarvestDaemon(harvest_func=harvest, jitter=0., clock=clock)
+    daemon.add_community('lsst-dm', interval=10.)
+    daemon.remove_community('lsst-dm')
+    daemon.add_community('lsst-dm', interval=10.)
+    for tick in range(4):
+        clock.now = tick * 10.
+        assert daemon.run_pending() == ['lsst-dm']
+    assert len(calls) == 4
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'default_interval': 0.},
+    {'default_interval': -1.},
+    {'jitter': -0.1},
+    {'jitter': 1.},
+    {'jitter': 2.},
+])
+def test_invalid_schedule(kwargs):
+    with pytest.raises(ValueError):
+        HarvestDaemon(harvest_func=lambda c: c, **kwargs)
+
+
+def test_invalid_interval():
+    daemon = HarvestDaemon(harvest_func=lambda c: c)
+    with pytest.raises(ValueError):
+        daemon.add_community('lsst-dm', interval=0.)
+    assert daemon.communities == []
+
+
+def test_remove_community_during_harvest():
+    daemon = HarvestDaemon(harvest_func=None, jitter=0.)
+
+    def harvest(community_name):
+        daemon.remove_community(community_name)
+        return community_name
+
+    daemon._harvest_func = harvest
+    daemon.add_community('lsst-dm')
+    assert daemon.refresh('lsst-dm') == 'lsst-dm'
+    assert daemon.communities == []
+    assert daemon._collections == {}
+    assert daemon.metrics() == {}
+
+
+def test_metrics():
+    clock = FakeClock()
+
+    def harvest(community_name):
+        clock.now += 2.
+        if community_name == 'broken':
+            raise RuntimeError('Zenodo is down')
+        return community_name
+
+    daemon = HarvestDaemon(harvest_func=harvest, jitter=0., clock=clock)
+    daemon.add_community('lsst-dm')
+    daemon.add_community('broken')
+    daemon.run_pending()
+    clock.now += 5.
+
+    metrics = daemon.metrics()
+    assert metrics['lsst-dm'].harvest_count == 1
+    assert metrics['lsst-dm'].last_duration == 2.
+    assert metrics['lsst-dm'].staleness == 5.
+    assert metrics['broken'].harvest_count == 0
+    assert metrics['broken'].failure_count == 1
+    assert metrics['broken'].staleness is None
+
+
+def test_metrics_empty():
+    metrics = HarvestMetrics()
+    assert metrics.mean_duration is None
+    assert metrics.staleness is None
+
+
+def test_single_flight_coalesces():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow(key):
+        calls.append(key)
+        started.set()
+        release.wait()
+        return key.upper()
+
+    flight = _SingleFlight()
+    results = []
+
+    def worker():
+        results.append(flight.do('lsst-dm', slow, 'lsst-dm'))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ['lsst-dm']
+    assert results == ['LSST-DM'] * 5
+
+
+def test_single_flight_error():
+    def fail(key):
+        raise RuntimeError(key)
+
+    flight = _SingleFlight()
+    with pytest.raises(RuntimeError):
+        flight.do('lsst-dm', fail, 'lsst-dm')
+    # A failed call doesn't stay in flight
+    assert flight.do('lsst-dm', lambda k: k, 'lsst-dm') == 'lsst-dm'
+
+
+def test_start_stop():
+    harvested = threading.Event()
+
+    def harvest(community_name):
+        harvested.set()
+        return community_name
+
+    daemon = HarvestDaemon(harvest_func=harvest, jitter=0.)
+    daemon.add_community('lsst-dm')
+    daemon.start()
+    assert harvested.wait(5.)
+    daemon.stop()
+    assert daemon.get_collection('lsst-dm') == 'lsst-dm'
+
+
+def test_stop_immediately():
+    daemon = HarvestDaemon(harvest_func=lambda c: c, jitter=0.)
+    for i in range(20):
+        daemon.add_community('community-{0}'.format(i))
+    daemon.start()
+    daemon.stop(wait=False)
+    daemon.start()
+    daemon.stop()
@@ -0,0 +1,113 @@
+import datetime
+import pickle
+
+import pytest
+
+from zenodio.dates import parse_date, to_datetime, DateIndex, DataciteDate
+
+
+@pytest.mark.parametrize('text,expected', [
+    ('2014', datetime.datetime(2014, 1, 1)),
+    ('2014-05', datetime.datetime(2014, 5, 1)),
+    ('2014-05-26', datetime.datetime(2014, 5, 26)),
+    (' 2014-05-26 ', datetime.datetime(2014, 5, 26)),
+    ('2014-05-26T08:23:41Z', datetime.datetime(2014, 5, 26, 8, 23, 41)),
+    ('2014-05-26T08:23', datetime.datetime(2014, 5, 26, 8, 23)),
+    ('2014-05-26T08:23:41.123+02:00',
+     datetime.datetime(2014, 5, 26, 6, 23, 41)),
+    ('2014-01-01/2014-06-30', datetime.datetime(2014, 1, 1)),
+    ('/2014-06-30', datetime.datetime(2014, 6, 30)),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', 'May 2014', '14-05-26', '2014-5-26'])
+def test_parse_date_invalid(text):
+    with pytest.raises(ValueError):
+        parse_date(text)
+
+
+def test_parse_date_cached():
+    assert parse_date('2015-12-19') is parse_date('2015-12-19')
+
+
+def test_to_datetime():
+    expected = datetime.datetime(2014, 5, 26)
+    assert to_datetime(expected) is expected
+    assert to_datetime(datetime.date(2014, 5, 26)) == expected
+    assert to_datetime('2014-05-26') == expected
+
+
+def test_date_index():
+    index = DateIndex([(parse_date('2014-06-05'), 'c'),
+                       (parse_date('2014-05-26'), 'a'),
+                       (parse_date('2014-06-02'), 'b'),
+                       (parse_date('2014-06-05'), 'd')])
+    assert list(index) == ['a', 'b', 'c', 'd']
+    assert index.between('2014-06-02', '2014-06-05') == ['b', 'c', 'd']
+    assert index.between('2014-06') == ['b', 'c', 'd']
+    assert index.since(datetime.date(2014, 6, 3)) == ['c', 'd']
+    assert index.until('2014-06-02') == ['a', 'b']
+    assert index.between('2015') == []
+
+
+@pytest.mark.parametrize('text,precision,end', [
+    ('2014', 'year', datetime.datetime(2014, 12, 31, 23, 59, 59, 999999)),
+    ('2014-02', 'month', datetime.datetime(2014, 2, 28, 23, 59, 59, 999999)),
+    ('2014-12', 'month', datetime.datetime(2014, 12, 31, 23, 59, 59, 999999)),
+    ('2014-05-26', 'day', datetime.datetime(2014, 5, 26, 23, 59, 59, 999999)),
+    ('2014-05-26T08:23Z', 'minute',
+     datetime.datetime(2014, 5, 26, 8, 23, 59, 999999)),
+    ('2014-05-26T08:23:41Z', 'second',
+     datetime.datetime(2014, 5, 26, 8, 23, 41, 999999)),
+])
+def test_parse_date_precision(text, precision, end):
+    date = parse_date(text)
+    assert isinstance(date, DataciteDate)
+    assert date.precision == precision
+    assert date.end == end
+
+
+def test_datacite_date_pickle():
+    date = parse_date('2014-05')
+    copy = pickle.loads(pickle.dumps(date))
+    assert copy == date
+    assert copy.precision == 'month'
+    assert copy.parts == (2014, 5)
+
+
+def test_datacite_date_is_a_datetime():
+    date = parse_date('2014-05')
+    later = date + datetime.timedelta(hours=1, microseconds=5)
+    assert later == datetime.datetime(2014, 5, 1, 1, 0, 0, 5)
+    # Derived dates are exact instants
+    assert date.replace(day=2).precision == 'second'
+    utc = datetime.timezone.utc
+    assert date.astimezone(utc).tzinfo is utc
+    with pytest.raises(ValueError):
+        DataciteDate(2014, precision='week')
+
+
+def test_to_datetime_aware():
+    tz = datetime.timezone(datetime.timedelta(hours=2))
+    aware = datetime.datetime(2014, 5, 26, 12, tzinfo=tz)
+    assert to_datetime(aware) == datetime.datetime(2014, 5, 26, 10)
+    assert to_datetime(aware).tzinfo is None
+
+
+def test_date_index_period_bounds():
+    index = DateIndex([(parse_date('2013-12-31T23:00:00Z'), 'a'),
+                       (parse_date('2014'), 'b'),
+                       (parse_date('2014-05-26T12:00:00Z'), 'c'),
+                       (parse_date('2014-12'), 'd'),
+                       (parse_date('2015-01-01'), 'e')])
+    assert index.between('2014', '2014') == ['b', 'c', 'd']
+    # A day-precision end covers the whole day
+    assert index.between('2014-05-01', '2014-05-26') == ['c']
+    assert index.between(end=datetime.date(2014, 5, 26)) == ['a', 'b', 'c']
+    # A plain datetime end is an exact instant
+    assert index.until(datetime.datetime(2014, 5, 26)) == ['a', 'b']
+    utc = datetime.timezone.utc
+    assert index.since(datetime.datetime(2014, 5, 26, tzinfo=utc)) == \
+        ['c', 'd', 'e']
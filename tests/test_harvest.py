@@ -1,19 +1,13 @@
-import pkg_resources
 import pytest
 import datetime
 
 import xmltodict
 
 from zenodio.harvest import (Datacite3Collection, zenodo_harvest_url,
-                             _pluralize, Author)
-
-
-@pytest.fixture
-def lisa7_posters_xml():
-    resource_args = (__name__, '../data/lisa7-posters_oai_datacite3.xml')
-    assert pkg_resources.resource_exists(*resource_args)
-    xml_data = pkg_resources.resource_string(*resource_args)
-    return xml_data
+                             _pluralize, Author, select_metadata_format,
+                             DublinCoreRecord, Datacite4Record, _split_page,
+                             BaseRecord, Datacite3Record, METADATA_FORMATS,
+                             register_metadata_format)
 
 
 def test_read_lisa7(lisa7_posters_xml):
@@ -121,3 +115,235 @@ def test_lisa7_first_resource_metadata(lisa7_posters_xml):
     assert authors[0].first_name == 'Dianne'
     assert authors[0].last_name == 'Dietrich'
     assert authors[0].affiliation == 'Cornell University Library'
+
+
+OAI_DC_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+<ListRecords>
+<record>
+<header><identifier>oai:zenodo.org:10165</identifier></header>
+<metadata>
+<oai_dc:dc xmlns:dc="http://purl.org/dc/elements/1.1/"
+  xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/">
+  <dc:creator>Dietrich, Dianne</dc:creator>
+  <dc:creator>Sick, Jonathan</dc:creator>
+  <dc:date>2014-05-26</dc:date>
+  <dc:description>&lt;p&gt;Abstract&lt;/p&gt;</dc:description>
+  <dc:identifier>https://zenodo.org/record/10165</dc:identifier>
+  <dc:identifier>https://doi.org/10.5281/zenodo.10165</dc:identifier>
+  <dc:title>Adapting educational materials</dc:title>
+</oai_dc:dc>
+</metadata>
+</record>
+</ListRecords>
+</OAI-PMH>
+"""
+
+OAI_DATACITE4_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+<ListRecords>
+<record>
+<header><identifier>oai:zenodo.org:10165</identifier></header>
+<metadata>
+<oai_datacite>
+<schemaVersion>4.1</schemaVersion>
+<payload>
+<resource xmlns="http://datacite.org/schema/kernel-4">
+  <identifier identifierType="DOI">10.5281/zenodo.10165</identifier>
+  <creators>
+    <creator>
+      <creatorName nameType="Personal">Dietrich, Dianne</creatorName>
+      <affiliation>Cornell University Library</affiliation>
+      <affiliation>LSST</affiliation>
+    </creator>
+  </creators>
+  <titles>
+    <title xml:lang="en">Adapting educational materials</title>
+  </titles>
+  <dates>
+    <date dateType="Issued">2014-05-26</date>
+  </dates>
+  <descriptions>
+    <description descriptionType="Abstract">Abstract</description>
+  </descriptions>
+</resource>
+</payload>
+</oai_datacite>
+</metadata>
+</record>
+</ListRecords>
+</OAI-PMH>
+"""
+
+
+def test_select_metadata_format():
+    assert select_metadata_format(['title', 'doi']) == 'oai_dc'
+    assert select_metadata_format(['doi', 'affiliations']) == 'datacite3'
+    with pytest.raises(ValueError):
+        select_metadata_format(['shoe_size'])
+
+
+def test_unknown_metadata_format():
+    with pytest.raises(ValueError):
+        Datacite3Collection([], metadata_format='marc21')
+
+
+def test_read_oai_dc():
+    collection = Datacite3Collection.from_collection_xml(
+        OAI_DC_XML, metadata_format='oai_dc')
+    records = list(collection.records())
+    assert len(records) == 1
+    record = records[0]
+    assert isinstance(record, DublinCoreRecord)
+    assert record.title == 'Adapting educational materials'
+    assert record.doi == '10.5281/zenodo.10165'
+    assert record.issue_date == datetime.datetime(2014, 5, 26)
+    assert record.abstract_html == '<p>Abstract</p>'
+    assert [a.last_name for a in record.authors] == ['Dietrich', 'Sick']
+
+
+def test_read_oai_datacite4():
+    collection = Datacite3Collection.from_collection_xml(
+        OAI_DATACITE4_XML, metadata_format='oai_datacite')
+    record = list(collection.records())[0]
+    assert isinstance(record, Datacite4Record)
+    assert record.title == 'Adapting educational materials'
+    assert record.doi == '10.5281/zenodo.10165'
+    assert record.issue_date == datetime.datetime(2014, 5, 26)
+    assert record.abstract_html == 'Abstract'
+    author = record.authors[0]
+    assert author.last_name == 'Dietrich'
+    assert author.affiliation == 'Cornell University Library'
+
+
+def test_read_datacite3_resource():
+    xml_data = OAI_DATACITE4_XML.replace(
+        '<oai_datacite>\n<schemaVersion>4.1</schemaVersion>\n<payload>', '')
+    xml_data = xml_data.replace('</payload>\n</oai_datacite>', '')
+    collection = Datacite3Collection.from_collection_xml(
+        xml_data, metadata_format='datacite3')
+    record = list(collection.records())[0]
+    assert record.doi == '10.5281/zenodo.10165'
+
+
+def test_split_page(lisa7_posters_xml):
+    chunks = _split_page(lisa7_posters_xml, 3)
+    assert len(chunks) == 3
+    collection = Datacite3Collection.from_collection_xml(lisa7_posters_xml)
+    dois = [r.doi for r in collection.records()]
+    chunk_dois = [r.doi for chunk in chunks for r in
+                  Datacite3Collection.from_collection_xml(chunk).records()]
+    assert chunk_dois == dois
+
+
+def test_split_page_more_chunks_than_records(lisa7_posters_xml):
+    n_records = len(list(Datacite3Collection.from_collection_xml(
+        lisa7_posters_xml).records()))
+    chunks = _split_page(lisa7_posters_xml, 100)
+    assert len(chunks) == n_records
+
+
+def test_from_pages_parallel(lisa7_posters_xml):
+    pages = [lisa7_posters_xml, lisa7_posters_xml]
+    serial = Datacite3Collection.from_pages(pages)
+    # Fewer pages than processes, so pages are split into byte ranges
+    parallel = Datacite3Collection.from_pages(pages, processes=3)
+    assert [r.digest for r in parallel.records()] == \
+        [r.digest for r in serial.records()]
+
+
+def test_record_dates():
+    xml_data = OAI_DATACITE4_XML.replace(
+        '<date dateType="Issued">2014-05-26</date>',
+        '<date dateType="Issued">2014</date>'
+        '<date dateType="Updated">2016-02-01T10:00:00Z</date>'
+        '<date dateType="Other">Spring 2014</date>')
+    collection = Datacite3Collection.from_collection_xml(
+        xml_data, metadata_format='oai_datacite')
+    record = next(collection.records())
+    assert record.issue_date == datetime.datetime(2014, 1, 1)
+    assert record.dates == {
+        'Issued': datetime.datetime(2014, 1, 1),
+        'Updated': datetime.datetime(2016, 2, 1, 10, 0, 0)}
+    assert record.dates is record.dates
+
+
+def test_issue_date_is_a_datetime(lisa7_posters_xml):
+    collection = Datacite3Collection.from_collection_xml(lisa7_posters_xml)
+    issue_date = next(collection.records()).issue_date
+    assert issue_date + datetime.timedelta(days=1) == \
+        datetime.datetime(2014, 5, 27)
+    assert issue_date - datetime.timedelta(days=26) == \
+        datetime.datetime(2014, 4, 30)
+    assert issue_date.replace(day=3) == datetime.datetime(2014, 5, 3)
+    assert issue_date.replace(day=3).end == \
+        datetime.datetime(2014, 5, 3, 0, 0, 0, 999999)
+    utc = datetime.timezone.utc
+    assert issue_date.replace(tzinfo=utc).astimezone(utc) == \
+        datetime.datetime(2014, 5, 26, tzinfo=utc)
+
+
+def test_collection_date_filtering(lisa7_posters_xml):
+    collection = Datacite3Collection.from_collection_xml(lisa7_posters_xml)
+    dates = [r.issue_date for r in collection.sorted_records()]
+    assert dates == sorted(dates)
+    assert [r.issue_date for r in
+            collection.sorted_records(reverse=True)] == dates[::-1]
+
+    june = collection.issued_between('2014-06-01', '2014-06-30')
+    assert len(june) == 8
+    assert all(r.issue_date.month == 6 for r in june)
+    assert collection.issued_between(end='2014-05-26')[0].doi == \
+        '10.5281/zenodo.10165'
+    # Year-precision bounds cover the whole year
+    assert len(collection.issued_between('2014', '2014')) == len(dates)
+    # None of the sample records have Updated dates
+    assert collection.updated_since('2000') == []
+
+
+def test_record_fields_are_attributes():
+    for metadata_format in METADATA_FORMATS.values():
+        for field in metadata_format.record_class.fields:
+            assert hasattr(metadata_format.record_class, field)
+
+
+def test_register_metadata_format_checks_fields():
+    class BadRecord(Datacite3Record):
+        fields = Datacite3Record.fields | frozenset(['shoe_size'])
+
+    with pytest.raises(ValueError):
+        register_metadata_format('bad', BadRecord, 10)
+    assert 'bad' not in METADATA_FORMATS
+
+
+def test_incomplete_record_class():
+    class IncompleteRecord(BaseRecord):
+        @staticmethod
+        def _unwrap(xml_dict):
+            return xml_dict
+
+    with pytest.raises(TypeError):
+        IncompleteRecord({})
+
+
+def test_affiliations():
+    collection = Datacite3Collection.from_collection_xml(
+        OAI_DATACITE4_XML, metadata_format='oai_datacite')
+    record = next(collection.records())
+    assert record.affiliations == ['Cornell University Library', 'LSST']
+
+
+def test_digest_ignores_key_order(lisa7_posters_xml):
+    def reverse_keys(value):
+        if isinstance(value, dict):
+            return dict((k, reverse_keys(value[k]))
+                        for k in reversed(list(value)))
+        if isinstance(value, list):
+            return [reverse_keys(v) for v in value]
+        return value
+
+    collection = Datacite3Collection.from_collection_xml(lisa7_posters_xml)
+    reordered = Datacite3Collection(
+        [reverse_keys(r) for r in collection._xml_records])
+    assert [r.digest for r in reordered.records()] == \
+        [r.digest for r in collection.records()]
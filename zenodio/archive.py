@@ -0,0 +1,428 @@
+"""
+Module for archiving raw OAI-PMH pages harvested from Zenodo.
+
+A :class:`~zenodio.archive.PageArchive` stores each raw ``ListRecords`` page,
+compressed, so that a harvest can be replayed later — for example, after
+changing how records are parsed — without downloading anything from Zenodo
+again.
+
+An archive is a directory with two files:
+
+``pages.dat``
+    Each page's compressed bytes, appended one after another.
+``index.jsonl``
+    One JSON object per page recording its community, metadata format,
+    resumption token, datestamp, byte offset and length in ``pages.dat``,
+    and whether it's the last page of its harvest.
+
+A harvest is complete once its last page (the one without a
+``resumptionToken``) is archived. Pages of a harvest that failed partway
+through stay in the archive, but aren't replayed unless asked for by
+``harvest_id``.
+
+Several processes can append to the same archive on platforms that support
+:func:`fcntl.flock` (Unix); elsewhere, only one process may write to an
+archive at a time.
+
+Pages can be compressed with ``'gzip'`` (the default) or ``'zstd'``. Zstandard
+compression requires the optional `zstandard
+<https://pypi.python.org/pypi/zstandard>`_ package.
+
+Examples
+--------
+
+Archive pages while harvesting:
+
+>>> from zenodio.archive import PageArchive
+>>> from zenodio.harvest import harvest_collection
+>>> archive = PageArchive('zenodo-pages')
+>>> collection = harvest_collection('lsst-dm', archive=archive)
+
+Later, rebuild the collection from the archive:
+
+>>> collection = PageArchive('zenodo-pages').replay('lsst-dm', processes=4)
+"""
+
+import collections
+import gzip
+import json
+import os
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .harvest import (Datacite3Collection, response_date, _parse_records,
+                      _parse_compact_records, _parallel_parse)
+# append() has a resumption_token argument of its own
+from .harvest import resumption_token as _next_resumption_token
+
+
+COMPRESSIONS = ('gzip', 'zstd', None)
+"""Supported page compression methods (`None` stores pages uncompressed)."""
+
+PageEntry = collections.namedtuple(
+    'PageEntry',
+    ['community_name', 'metadata_format', 'harvest_id', 'page',
+     'resumption_token', 'datestamp', 'offset', 'length', 'compression',
+     'final'])
+PageEntry.__doc__ = """Index entry for an archived page.
+
+Attributes
+----------
+community_name : str
+    Zenodo community identifier.
+metadata_format : str
+    OAI-PMH metadata prefix of the page's records.
+harvest_id : str
+    Identifier shared by all pages archived during the same harvest.
+page : int
+    Zero-based number of the page within its harvest.
+resumption_token : str
+    The resumption token used to request this page, or `None` for the
+    first page of a harvest.
+datestamp : str
+    The page's OAI-PMH ``responseDate``.
+offset : int
+    Byte offset of the compressed page in ``pages.dat``.
+length : int
+    Byte length of the compressed page in ``pages.dat``.
+compression : str
+    Compression method of the page.
+final : bool
+    `True` if the page is the last of its harvest (it has no
+    ``resumptionToken``), meaning the harvest completed.
+"""
+
+
+class PageArchive(object):
+    """An on-disk archive of compressed, raw OAI-PMH pages.
+
+    Parameters
+    ----------
+    path : str
+        Archive directory. It's created if it doesn't exist.
+    compression : str, optional
+        Compression method for newly archived pages: ``'gzip'``, ``'zstd'``,
+        or `None`. Pages already in the archive keep their own compression.
+    level : int, optional
+        Compression level. Defaults to the compressor's default level.
+
+    Notes
+    -----
+    :meth:`append` is safe to call from several threads. On platforms with
+    :func:`fcntl.flock` (Unix), it also holds an exclusive lock on
+    ``pages.dat`` while writing, so several processes can append to the
+    same archive. Elsewhere, only one process may write to an archive.
+    """
+
+    data_filename = 'pages.dat'
+    index_filename = 'index.jsonl'
+
+    def __init__(self, path, compression='gzip', level=None):
+        super().__init__()
+        _check_compression(compression)
+        self.path = path
+        self.compression = compression
+        self.level = level
+        self._lock = threading.Lock()
+        self._page_counts = {}
+        os.makedirs(path, exist_ok=True)
+
+    @property
+    def data_path(self):
+        """Path of the archive's page data file (`str`)."""
+        return os.path.join(self.path, self.data_filename)
+
+    @property
+    def index_path(self):
+        """Path of the archive's index file (`str`)."""
+        return os.path.join(self.path, self.index_filename)
+
+    @staticmethod
+    def new_harvest_id():
+        """Create a unique identifier for a new harvest (`str`)."""
+        return uuid.uuid4().hex
+
+    def append(self, xml_content, community_name, metadata_format,
+               resumption_token=None, harvest_id=None):
+        """Archive a raw OAI-PMH page.
+
+        :func:`zenodio.harvest.harvest_pages` calls this method for each page
+        when it's given an ``archive``. A page without a ``resumptionToken``
+        of its own is the last page, and completes its harvest.
+
+        Parameters
+        ----------
+        xml_content : bytes or str
+            OAI-PMH ``ListRecords`` XML content.
+        community_name : str
+            Zenodo community identifier.
+        metadata_format : str
+            OAI-PMH metadata prefix of the page's records.
+        resumption_token : str, optional
+            The resumption token used to request this page, or `None` for the
+            first page of a harvest.
+        harvest_id : str, optional
+            Identifier shared by all pages of a harvest (see
+            :meth:`new_harvest_id`). If `None`, the page is archived as a
+            harvest of its own.
+
+        Returns
+        -------
+        entry : :class:`PageEntry`
+            Index entry for the archived page.
+        """
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode('utf-8')
+        if harvest_id is None:
+            harvest_id = self.new_harvest_id()
+        data = _compress(xml_content, self.compression, self.level)
+
+        datestamp = response_date(xml_content)
+        final = _next_resumption_token(xml_content) is None
+
+        with self._lock, open(self.data_path, 'ab') as data_file:
+            # Other processes can't write between finding the offset and
+            # indexing the page while this lock is held; closing the file
+            # releases it.
+            _lock_file(data_file)
+            if harvest_id not in self._page_counts:
+                self._page_counts[harvest_id] = len(
+                    self.entries(harvest_id=harvest_id))
+            page = self._page_counts[harvest_id]
+            self._page_counts[harvest_id] += 1
+            offset = data_file.seek(0, os.SEEK_END)
+            data_file.write(data)
+            data_file.flush()
+            entry = PageEntry(community_name=community_name,
+                              metadata_format=metadata_format,
+                              harvest_id=harvest_id,
+                              page=page,
+                              resumption_token=resumption_token,
+                              datestamp=datestamp,
+                              offset=offset,
+                              length=len(data),
+                              compression=self.compression,
+                              final=final)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry._asdict()) + '\n')
+        return entry
+
+    def entries(self, community_name=None, metadata_format=None,
+                harvest_id=None):
+        """Get index entries for archived pages, in the order they were
+        archived.
+
+        Parameters
+        ----------
+        community_name : str, optional
+            Only include pages for this community.
+        metadata_format : str, optional
+            Only include pages in this metadata format.
+        harvest_id : str, optional
+            Only include pages from this harvest.
+
+        Returns
+        -------
+        entries : list
+            :class:`PageEntry` instances.
+        """
+        if not os.path.exists(self.index_path):
+            return []
+        entries = []
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = PageEntry(**json.loads(line))
+                if community_name is not None and \
+                        entry.community_name != community_name:
+                    continue
+                if metadata_format is not None and \
+                        entry.metadata_format != metadata_format:
+                    continue
+                if harvest_id is not None and entry.harvest_id != harvest_id:
+                    continue
+                entries.append(entry)
+        return entries
+
+    def read(self, entry):
+        """Read an archived page.
+
+        Parameters
+        ----------
+        entry : :class:`PageEntry`
+            Index entry for the page.
+
+        Returns
+        -------
+        xml_content : bytes
+            The page's raw OAI-PMH XML content.
+        """
+        return _read_page(self.data_path, entry.offset, entry.length,
+                          entry.compression)
+
+    def pages(self, community_name=None, metadata_format=None,
+              harvest_id=None):
+        """Yield raw archived pages.
+
+        Parameters are the same as for :meth:`entries`.
+
+        Yields
+        ------
+        xml_content : bytes
+            Raw OAI-PMH XML content for each page, in archive order.
+        """
+        for entry in self.entries(community_name=community_name,
+                                  metadata_format=metadata_format,
+                                  harvest_id=harvest_id):
+            yield self.read(entry)
+
+    def latest_harvest_id(self, community_name, metadata_format=None,
+                          complete=True):
+        """Get the identifier of a community's most recent archived harvest.
+
+        Parameters
+        ----------
+        community_name : str
+            Zenodo community identifier.
+        metadata_format : str, optional
+            Only consider harvests in this metadata format.
+        complete : bool, optional
+            If `True` (default), only consider harvests whose last page was
+            archived, skipping harvests that failed partway through.
+
+        Returns
+        -------
+        harvest_id : str
+            The harvest identifier, or `None` if no matching harvest is
+            archived.
+        """
+        entries = self.entries(community_name=community_name,
+                               metadata_format=metadata_format)
+        if complete:
+            entries = [e for e in entries if e.final]
+        if not entries:
+            return None
+        return entries[-1].harvest_id
+
+    def replay(self, community_name, metadata_format=None, harvest_id=None,
+               processes=None):
+        """Rebuild a collection from an archived harvest, without network
+        access.
+
+        Parameters
+        ----------
+        community_name : str
+            Zenodo community identifier.
+        metadata_format : str, optional
+            Metadata format of the harvest to replay. By default, the format
+            of the most recent harvest is used.
+        harvest_id : str, optional
+            Identifier of the harvest to replay, complete or not. Defaults to
+            the community's most recent complete harvest (see
+            :meth:`latest_harvest_id`).
+        processes : int, optional
+            If set, pages are read, decompressed and parsed in parallel
+            across a pool of this many worker processes.
+
+        Returns
+        -------
+        collection : :class:`zenodio.harvest.Datacite3Collection`
+            The collection of records from the harvest's pages.
+
+        Raises
+        ------
+        KeyError
+            Raised if no matching (complete) harvest is archived.
+        """
+        if harvest_id is None:
+            harvest_id = self.latest_harvest_id(
+                community_name, metadata_format=metadata_format)
+        entries = []
+        if harvest_id is not None:
+            entries = self.entries(community_name=community_name,
+                                   metadata_format=metadata_format,
+                                   harvest_id=harvest_id)
+        if not entries:
+            raise KeyError('No archived harvest for community '
+                           '{0!r}'.format(community_name))
+        entries.sort(key=lambda e: e.page)
+        metadata_format = entries[0].metadata_format
+
+        args = ([self.data_path] * len(entries),
+                [e.offset for e in entries],
+                [e.length for e in entries],
+                [e.compression for e in entries])
+        if processes is None:
+            page_records = map(_load_page_records, *args)
+            xml_records = [r for records in page_records for r in records]
+        else:
+            xml_records = _parallel_parse(_load_compact_page_records, args,
+                                          processes)
+        return Datacite3Collection(xml_records,
+                                   metadata_format=metadata_format)
+
+
+def _check_compression(compression):
+    if compression not in COMPRESSIONS:
+        raise ValueError('Unknown compression {0!r}; use one of '
+                         '{1}'.format(compression, COMPRESSIONS))
+    if compression == 'zstd' and zstandard is None:
+        raise ImportError('zstd compression requires the zstandard package')
+
+
+def _compress(data, compression, level=None):
+    if compression == 'gzip':
+        return gzip.compress(data, 9 if level is None else level)
+    elif compression == 'zstd':
+        if level is None:
+            compressor = zstandard.ZstdCompressor()
+        else:
+            compressor = zstandard.ZstdCompressor(level=level)
+        return compressor.compress(data)
+    return data
+
+
+def _decompress(data, compression):
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    elif compression == 'zstd':
+        _check_compression(compression)
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def _lock_file(f):
+    """Lock an open file exclusively until it's closed, if the platform
+    supports it.
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _read_page(data_path, offset, length, compression):
+    with open(data_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+    return _decompress(data, compression)
+
+
+def _load_page_records(data_path, offset, length, compression):
+    """Read, decompress and parse an archived page."""
+    return _parse_records(_read_page(data_path, offset, length, compression))
+
+
+def _load_compact_page_records(data_path, offset, length, compression):
+    """Read, decompress and parse an archived page in a worker process."""
+    return _parse_compact_records(
+        _read_page(data_path, offset, length, compression))
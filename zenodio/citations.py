@@ -0,0 +1,317 @@
+"""
+Module for rendering citations of Zenodo records.
+
+Use :func:`~zenodio.citations.render` to format a single
+:class:`~zenodio.harvest.Datacite3Record` as a citation, or
+:func:`~zenodio.citations.render_collection` to format every record in a
+:class:`~zenodio.harvest.Datacite3Collection`. Supported formats are
+``'bibtex'``, ``'csl-json'`` and ``'html'``.
+
+Rendered citations are memoized by a
+:class:`~zenodio.citations.CitationRenderer`, keyed by a digest of the record
+fields that citations use (DOI, title, authors and issue date, with its
+precision) and the format, so re-rendering an unchanged bibliography is
+cheap, even from freshly harvested record objects.
+
+Examples
+--------
+
+>>> from zenodio.harvest import harvest_collection
+>>> from zenodio.citations import render_collection
+>>> collection = harvest_collection('lsst-dm')
+>>> bibtex = '\\n\\n'.join(render_collection(collection, 'bibtex'))
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import html
+import json
+import re
+import sys
+import threading
+
+from .dates import date_parts
+
+
+FORMATS = ('bibtex', 'csl-json', 'html')
+"""Names of supported citation formats."""
+
+
+class CitationRenderer(object):
+    """Render citations for Zenodo records with a bounded, memoized cache.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of rendered citations to keep. The least recently
+        used citations are evicted first.
+    """
+    def __init__(self, maxsize=4096):
+        super().__init__()
+        self._cache = _LRUCache(maxsize)
+
+    def render(self, record, format='bibtex'):
+        """Render a citation for a record.
+
+        Parameters
+        ----------
+        record : :class:`zenodio.harvest.Datacite3Record`
+            The record to cite.
+        format : str, optional
+            Citation format: ``'bibtex'``, ``'csl-json'`` or ``'html'``.
+
+        Returns
+        -------
+        citation : str
+            The rendered citation.
+        """
+        _check_format(format)
+        key = (_citation_digest(record), format)
+        try:
+            return self._cache[key]
+        except KeyError:
+            citation = _render(record, format)
+            self._cache[key] = citation
+            return citation
+
+    def render_collection(self, collection, format='bibtex', processes=None):
+        """Render citations for every record in a collection.
+
+        Parameters
+        ----------
+        collection : :class:`zenodio.harvest.Datacite3Collection`
+            The collection to cite.
+        format : str, optional
+            Citation format: ``'bibtex'``, ``'csl-json'`` or ``'html'``.
+        processes : int, optional
+            If set, records that aren't already cached are rendered across a
+            pool of this many worker processes. By default, records are
+            rendered in this process.
+
+        Returns
+        -------
+        citations : list
+            Rendered citations (`str`), in the same order as
+            :meth:`~zenodio.harvest.Datacite3Collection.records`.
+        """
+        _check_format(format)
+        records = list(collection.records())
+        keys = [(_citation_digest(record), format) for record in records]
+        citations = [None] * len(records)
+        pending = []
+        for i, key in enumerate(keys):
+            try:
+                citations[i] = self._cache[key]
+            except KeyError:
+                pending.append(i)
+
+        if processes is None or len(pending) < 2:
+            for i in pending:
+                citations[i] = _render(records[i], format)
+                self._cache[keys[i]] = citations[i]
+            return citations
+
+        map_kwargs = {}
+        if sys.version_info >= (3, 5):
+            # Executor.map only accepts chunksize since Python 3.5
+            map_kwargs['chunksize'] = _chunksize(len(pending), processes)
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            rendered = executor.map(_render,
+                                    [records[i] for i in pending],
+                                    [format] * len(pending),
+                                    **map_kwargs)
+            for i, citation in zip(pending, rendered):
+                self._cache[keys[i]] = citation
+                citations[i] = citation
+        return citations
+
+    def clear(self):
+        """Empty the cache of rendered citations."""
+        self._cache.clear()
+
+    @property
+    def cache_size(self):
+        """Number of rendered citations currently cached (`int`)."""
+        return len(self._cache)
+
+
+def render(record, format='bibtex'):
+    """Render a citation for a record using the shared, memoized
+    :class:`~zenodio.citations.CitationRenderer`.
+
+    See :meth:`CitationRenderer.render`.
+    """
+    return _default_renderer.render(record, format)
+
+
+def render_collection(collection, format='bibtex', processes=None):
+    """Render citations for every record in a collection using the shared,
+    memoized :class:`~zenodio.citations.CitationRenderer`.
+
+    See :meth:`CitationRenderer.render_collection`.
+    """
+    return _default_renderer.render_collection(collection, format,
+                                               processes=processes)
+
+
+def render_bibtex(record):
+    """Format a record as a BibTeX ``@misc`` entry (`str`)."""
+    fields = []
+    authors = record.authors
+    if authors:
+        fields.append(('author', ' and '.join(
+            _bibtex_escape(a.last_first) for a in authors)))
+    fields.append(('title', '{' + _bibtex_escape(record.title) + '}'))
+    issue_date = record.issue_date
+    if issue_date is not None:
+        # Only cite the parts of the date that are actually known
+        parts = date_parts(issue_date)
+        fields.append(('year', str(parts[0])))
+        if len(parts) > 1:
+            fields.append(('month', _BIBTEX_MONTHS[parts[1] - 1]))
+    if record.doi is not None:
+        fields.append(('doi', record.doi))
+
+    lines = ['@misc{{{0},'.format(_bibtex_key(record))]
+    lines.extend('  {0} = {{{1}}},'.format(k, v) for k, v in fields)
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def render_csl_json(record):
+    """Format a record as a CSL-JSON item (`str`)."""
+    item = collections.OrderedDict()
+    item['id'] = record.doi or _citation_digest(record)
+    item['type'] = 'document'
+    item['title'] = record.title
+    item['author'] = [_csl_name(a) for a in record.authors]
+    issue_date = record.issue_date
+    if issue_date is not None:
+        item['issued'] = {'date-parts': [list(date_parts(issue_date))]}
+    if record.doi is not None:
+        item['DOI'] = record.doi
+    return json.dumps(item)
+
+
+def render_html(record):
+    """Format a record as an HTML citation snippet (`str`)."""
+    parts = ['<span class="zenodio-citation">']
+    authors = record.authors
+    if authors:
+        parts.append('<span class="authors">{0}</span> '.format(
+            html.escape('; '.join(a.last_first for a in authors))))
+    issue_date = record.issue_date
+    if issue_date is not None:
+        parts.append('({0}). '.format(issue_date.year))
+    parts.append('<span class="title">{0}</span>. '.format(
+        html.escape(record.title)))
+    if record.doi is not None:
+        doi = html.escape(record.doi)
+        parts.append('<a class="doi" href="https://doi.org/{0}">'
+                     'doi:{0}</a>'.format(doi))
+    parts.append('</span>')
+    return ''.join(parts)
+
+
+_RENDERERS = {
+    'bibtex': render_bibtex,
+    'csl-json': render_csl_json,
+    'html': render_html,
+}
+
+
+def _render(record, format):
+    return _RENDERERS[format](record)
+
+
+def _citation_digest(record):
+    """SHA-1 hex digest of the record fields that citations are rendered
+    from.
+
+    Unlike :attr:`zenodio.harvest.Datacite3Record.digest`, this doesn't
+    serialize the whole record (including its abstract), so it's cheaper
+    than rendering, and it only changes when a citation could.
+    """
+    issue_date = record.issue_date
+    fields = [record.doi,
+              record.title,
+              [author.last_first for author in record.authors],
+              None if issue_date is None else date_parts(issue_date)]
+    content = json.dumps(fields, separators=(',', ':'))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def _check_format(format):
+    if format not in _RENDERERS:
+        raise ValueError('Unknown citation format {0!r}; use one of '
+                         '{1}'.format(format, ', '.join(FORMATS)))
+
+
+def _chunksize(n_items, processes):
+    # Several chunks per worker balances the load without paying
+    # inter-process overhead for every record.
+    return max(1, n_items // (processes * 4))
+
+
+# BibTeX's predefined month macros (strftime's %b is locale-dependent)
+_BIBTEX_MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+                  'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+
+_BIBTEX_SPECIAL = re.compile(r'([&%$#_{}])')
+
+
+def _bibtex_escape(text):
+    return _BIBTEX_SPECIAL.sub(r'\\\1', text)
+
+
+def _bibtex_key(record):
+    """BibTeX citation key derived from the DOI, e.g. ``zenodo_10165``.
+
+    Records without a DOI are keyed by a digest of their cited fields.
+    """
+    if record.doi is None:
+        return 'zenodio_' + _citation_digest(record)[:10]
+    suffix = record.doi.split('/')[-1]
+    return re.sub(r'[^A-Za-z0-9]+', '_', suffix)
+
+
+def _csl_name(author):
+    if ',' not in author.last_first:
+        return {'literal': author.last_first}
+    return collections.OrderedDict([('family', author.last_name),
+                                    ('given', author.first_name)])
+
+
+class _LRUCache(object):
+    """A thread-safe, bounded mapping that evicts the least recently used
+    items.
+    """
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._data.pop(key)
+            self._data[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_default_renderer = CitationRenderer()
@@ -0,0 +1,479 @@
+"""
+Long-running harvest daemon for keeping Zenodo Community metadata fresh.
+
+:class:`~zenodio.daemon.HarvestDaemon` wraps
+:func:`~zenodio.harvest.harvest_collection` with a scheduler that refreshes
+each registered community on its own interval (with random jitter so that
+many communities don't all hit Zenodo at once). Between refreshes, the latest
+:class:`~zenodio.harvest.Datacite3Collection` for each community is served
+from memory.
+
+Concurrent requests for the same community are coalesced: if a harvest for
+``'lsst-dm'`` is already in flight, other callers wait for that harvest's
+result rather than starting their own.
+
+Examples
+--------
+
+>>> from zenodio.daemon import HarvestDaemon
+>>> daemon = HarvestDaemon(default_interval=3600.)
+>>> daemon.add_community('lsst-dm')
+>>> daemon.add_community('lisa7-posters', interval=86400.)
+>>> daemon.start()
+>>> collection = daemon.get_collection('lsst-dm')
+>>> daemon.metrics()['lsst-dm'].staleness
+12.3
+>>> daemon.stop()
+"""
+
+import concurrent.futures
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from .harvest import harvest_collection
+
+
+class HarvestDaemon(object):
+    """Periodically harvest Zenodo communities and serve the latest
+    collections from memory.
+
+    Parameters
+    ----------
+    harvest_func : callable, optional
+        Function that takes a community identifier and returns a
+        :class:`~zenodio.harvest.Datacite3Collection`. Defaults to
+        :func:`zenodio.harvest.harvest_collection`.
+    default_interval : float, optional
+        Refresh interval, in seconds, for communities added without an
+        explicit ``interval``.
+    jitter : float, optional
+        Fractional jitter applied to each refresh interval, at least 0 and
+        less than 1. With ``jitter=0.1``, a 3600 second interval is randomly
+        scheduled between 3240 and 3960 seconds after the previous refresh.
+    max_workers : int, optional
+        Maximum number of harvests the scheduler runs concurrently.
+    clock : callable, optional
+        Monotonic clock returning seconds. Defaults to :func:`time.monotonic`.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``default_interval`` isn't positive, or ``jitter`` isn't
+        in the range [0, 1).
+    """
+    def __init__(self, harvest_func=harvest_collection, default_interval=3600.,
+                 jitter=0.1, max_workers=4, clock=time.monotonic):
+        super().__init__()
+        _check_interval(default_interval)
+        if not 0. <= jitter < 1.:
+            raise ValueError('jitter must be in the range [0, 1), '
+                             'not {0!r}'.format(jitter))
+        self._harvest_func = harvest_func
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._intervals = {}
+        self._schedule = []  # heap of (due_time, community_name, entry_id)
+        self._entry_ids = itertools.count()
+        # Each registered community's live schedule entry. Entries left in
+        # the heap by remove_community() are skipped when they're popped.
+        self._scheduled = {}
+        self._collections = {}
+        self._metrics = {}
+        self._single_flight = _SingleFlight()
+
+        self._thread = None
+        self._executor = None
+        self._stopping = False
+
+    def add_community(self, community_name, interval=None):
+        """Register a community for periodic harvesting.
+
+        The first harvest is scheduled within the community's jitter window
+        (for example, within 360 seconds for a 3600 second interval with
+        ``jitter=0.1``) so that communities registered together don't all
+        hit Zenodo at once. Subsequent harvests follow the community's
+        ``interval``.
+
+        Parameters
+        ----------
+        community_name : str
+            Zenodo community identifier.
+        interval : float, optional
+            Refresh interval in seconds. Defaults to the daemon's
+            ``default_interval``.
+
+        Raises
+        ------
+        ValueError
+            Raised if ``interval`` isn't positive.
+        """
+        if interval is None:
+            interval = self.default_interval
+        _check_interval(interval)
+        delay = interval * random.uniform(0., self.jitter)
+        self._register(community_name, interval, delay)
+
+    def _register(self, community_name, interval, delay):
+        """Register a community with its first harvest ``delay`` seconds
+        from now.
+        """
+        with self._wakeup:
+            if community_name not in self._intervals:
+                self._metrics[community_name] = HarvestMetrics(self._clock)
+                self._push(self._clock() + delay, community_name)
+            self._intervals[community_name] = interval
+            self._wakeup.notify()
+
+    def remove_community(self, community_name):
+        """Stop harvesting a community and drop its cached collection.
+
+        Parameters
+        ----------
+        community_name : str
+            Zenodo community identifier.
+        """
+        with self._wakeup:
+            self._intervals.pop(community_name, None)
+            self._collections.pop(community_name, None)
+            self._metrics.pop(community_name, None)
+            # The community's entry is skipped when it's popped from the
+            # schedule, so there's no need to rebuild the heap here.
+            self._scheduled.pop(community_name, None)
+            self._wakeup.notify()
+
+    @property
+    def communities(self):
+        """Sorted `list` of registered community identifiers."""
+        with self._lock:
+            return sorted(self._intervals)
+
+    def get_collection(self, community_name):
+        """Get the latest collection for a community.
+
+        If the community has already been harvested, the in-memory
+        collection is returned immediately. Otherwise the community is
+        harvested now (coalesced with any harvest already in flight).
+
+        Communities that aren't registered yet are registered with the
+        daemon's ``default_interval``, so their collection is kept fresh
+        from then on.
+
+        Parameters
+        ----------
+        community_name : str
+            Zenodo community identifier.
+
+        Returns
+        -------
+        collection : :class:`zenodio.harvest.Datacite3Collection`
+            The most recently harvested collection.
+        """
+        with self._lock:
+            collection = self._collections.get(community_name)
+            registered = community_name in self._intervals
+        if collection is not None:
+            return collection
+        if not registered:
+            # Harvesting now, so schedule the next refresh an interval out
+            self._register(community_name, self.default_interval,
+                           self._jittered(self.default_interval))
+        return self.refresh(community_name)
+
+    def refresh(self, community_name):
+        """Harvest a community now, coalescing with any in-flight harvest.
+
+        If another thread is already harvesting ``community_name``, this
+        call waits for and returns that harvest's result instead of making
+        a duplicate request to Zenodo.
+
+        Only harvests of registered communities are kept in memory and
+        counted in the metrics.
+
+        Parameters
+        ----------
+        community_name : str
+            Zenodo community identifier.
+
+        Returns
+        -------
+        collection : :class:`zenodio.harvest.Datacite3Collection`
+            The freshly harvested collection.
+        """
+        return self._single_flight.do(community_name, self._harvest,
+                                      community_name)
+
+    def run_pending(self):
+        """Synchronously refresh every community whose refresh is due.
+
+        This is what the background scheduler thread does on each wakeup;
+        it's also useful for driving the daemon from an existing event loop.
+
+        Returns
+        -------
+        refreshed : list
+            Identifiers of the communities that were refreshed.
+        """
+        refreshed = []
+        for community_name in self._pop_due():
+            try:
+                self.refresh(community_name)
+            except Exception:
+                # Failures are counted in the metrics; keep serving the
+                # previous collection until the next scheduled refresh.
+                pass
+            refreshed.append(community_name)
+        return refreshed
+
+    def metrics(self):
+        """Harvest metrics for each registered community.
+
+        Returns
+        -------
+        metrics : dict
+            Mapping of community identifier to
+            :class:`~zenodio.daemon.HarvestMetrics`.
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def start(self):
+        """Start the background scheduler thread."""
+        with self._wakeup:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers)
+            self._thread = threading.Thread(target=self._run,
+                                            name='zenodio-harvest-daemon',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self, wait=True):
+        """Stop the background scheduler thread.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            If `True`, block until in-flight harvests have finished.
+        """
+        with self._wakeup:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._wakeup.notify_all()
+            thread, executor = self._thread, self._executor
+            self._thread = None
+            self._executor = None
+        if wait:
+            thread.join()
+        executor.shutdown(wait=wait)
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if self._is_stopped():
+                    return
+                timeout = None
+                if self._schedule:
+                    timeout = max(0., self._schedule[0][0] - self._clock())
+                if timeout is None or timeout > 0.:
+                    self._wakeup.wait(timeout)
+                    continue
+            due = self._pop_due()
+            with self._wakeup:
+                # stop() may have run since the lock was released
+                if self._is_stopped():
+                    return
+                executor = self._executor
+                for community_name in due:
+                    executor.submit(self._scheduled_refresh, community_name)
+
+    def _is_stopped(self):
+        # A thread left running by stop(wait=False) must also exit if the
+        # daemon has since been restarted with a new scheduler thread.
+        return self._stopping or \
+            self._thread is not threading.current_thread()
+
+    def _scheduled_refresh(self, community_name):
+        try:
+            self.refresh(community_name)
+        except Exception:
+            pass
+
+    def _pop_due(self):
+        """Pop due communities off the schedule and reschedule them."""
+        due = []
+        with self._wakeup:
+            now = self._clock()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, community_name, entry_id = heapq.heappop(self._schedule)
+                if self._scheduled.get(community_name) != entry_id:
+                    # Stale entry of a removed (or removed and re-added)
+                    # community
+                    continue
+                due.append(community_name)
+                self._push(now + self._next_interval(community_name),
+                           community_name)
+        return due
+
+    def _push(self, due_time, community_name):
+        """Schedule a community's next refresh, replacing any previous
+        entry. Call with the lock held.
+        """
+        entry_id = next(self._entry_ids)
+        self._scheduled[community_name] = entry_id
+        heapq.heappush(self._schedule, (due_time, community_name, entry_id))
+
+    def _next_interval(self, community_name):
+        return self._jittered(self._intervals[community_name])
+
+    def _jittered(self, interval):
+        return interval * (1. + random.uniform(-self.jitter, self.jitter))
+
+    def _harvest(self, community_name):
+        start = self._clock()
+        try:
+            collection = self._harvest_func(community_name)
+        except Exception:
+            with self._lock:
+                metrics = self._metrics.get(community_name)
+                if metrics is not None:
+                    metrics._record_failure(self._clock() - start)
+            raise
+        end = self._clock()
+        with self._lock:
+            # The community may have been removed while the harvest was in
+            # flight; don't resurrect its collection or metrics.
+            if community_name in self._intervals:
+                self._collections[community_name] = collection
+                self._metrics[community_name]._record_success(end - start,
+                                                              end)
+        return collection
+
+
+def _check_interval(interval):
+    if not interval > 0.:
+        raise ValueError('Refresh intervals must be positive, '
+                         'not {0!r}'.format(interval))
+
+
+class HarvestMetrics(object):
+    """Harvest timing and freshness metrics for a single community.
+
+    :class:`~zenodio.daemon.HarvestMetrics` instances are created by
+    :class:`HarvestDaemon`; get them from
+    :meth:`HarvestDaemon.metrics`.
+
+    Attributes
+    ----------
+    harvest_count : int
+        Number of successful harvests.
+    failure_count : int
+        Number of failed harvests.
+    last_duration : float
+        Duration, in seconds, of the most recent harvest attempt (successful
+        or not). `None` if the community hasn't been harvested yet.
+    total_duration : float
+        Total duration, in seconds, of all harvest attempts.
+    max_duration : float
+        Longest harvest attempt, in seconds.
+    last_success : float
+        Clock time of the most recent successful harvest, or `None`.
+    """
+    def __init__(self, clock=time.monotonic):
+        super().__init__()
+        self._clock = clock
+        self.harvest_count = 0
+        self.failure_count = 0
+        self.last_duration = None
+        self.total_duration = 0.
+        self.max_duration = 0.
+        self.last_success = None
+
+    @property
+    def mean_duration(self):
+        """Mean duration, in seconds, of all harvest attempts (`float`)."""
+        attempts = self.harvest_count + self.failure_count
+        if attempts == 0:
+            return None
+        return self.total_duration / attempts
+
+    @property
+    def staleness(self):
+        """Seconds since the last successful harvest (`float`).
+
+        `None` if the community hasn't been harvested successfully yet.
+        """
+        if self.last_success is None:
+            return None
+        return self._clock() - self.last_success
+
+    def _record_duration(self, duration):
+        self.last_duration = duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def _record_success(self, duration, when):
+        self._record_duration(duration)
+        self.harvest_count += 1
+        self.last_success = when
+
+    def _record_failure(self, duration):
+        self._record_duration(duration)
+        self.failure_count += 1
+
+
+class _SingleFlight(object):
+    """Coalesce concurrent calls that share a key into a single call.
+
+    The first caller for a key runs the function; callers that arrive while
+    it's running block and receive the same result (or exception).
+    """
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = func(*args, **kwargs)
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class _Call(object):
+    """State for an in-flight :class:`_SingleFlight` call."""
+    def __init__(self):
+        super().__init__()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
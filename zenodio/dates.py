@@ -0,0 +1,325 @@
+"""
+Module for parsing and indexing DataCite dates.
+
+DataCite records carry several kinds of dates (``Issued``, ``Created``,
+``Updated``, ``Available``, and so on), at varying precision: a year
+(``2014``), a month (``2014-05``), a day (``2014-05-26``), or a full
+timestamp. Ranges (``2014-01-01/2014-06-30``) are also allowed.
+
+:func:`~zenodio.dates.parse_date` parses any of these forms into a
+:class:`~zenodio.dates.DataciteDate`, a :class:`datetime.datetime` that
+remembers its precision, and caches results so that dates shared by many
+records are only parsed once. :class:`~zenodio.dates.DateIndex` keeps items
+sorted by date for fast range queries; see
+:meth:`zenodio.harvest.Datacite3Collection.records_between`.
+"""
+
+import bisect
+import datetime
+import functools
+import re
+
+
+PRECISIONS = ('year', 'month', 'day', 'minute', 'second')
+"""Precisions of DataCite dates, from coarsest to finest."""
+
+
+class DataciteDate(datetime.datetime):
+    """A naive (UTC) :class:`datetime.datetime` that records the precision
+    of the date it was parsed from.
+
+    A ``2014`` date is the period from 2014-01-01 through the end of 2014;
+    as a :class:`datetime.datetime` it's the start of that period, and
+    :attr:`end` is the last instant of it.
+
+    :class:`DataciteDate`\ s behave like any other
+    :class:`datetime.datetime`. Dates derived from them, for example by
+    arithmetic or :meth:`~datetime.datetime.replace`, are exact instants
+    with ``'second'`` precision.
+
+    Parameters
+    ----------
+    year, month, day, hour, minute, second, microsecond, tzinfo
+        Date and time fields, as for :class:`datetime.datetime`.
+    fold : int, optional
+        As for :class:`datetime.datetime` (Python 3.6+).
+    precision : str, optional
+        One of :data:`PRECISIONS`.
+    """
+    # Instances that datetime builds itself (such as with ``replace()``
+    # before Python 3.12) bypass __new__ and use this class attribute.
+    precision = 'second'
+
+    def __new__(cls, year, month=1, day=1, hour=0, minute=0, second=0,
+                microsecond=0, tzinfo=None, *, fold=0, precision='second'):
+        if precision not in PRECISIONS:
+            raise ValueError('Unknown precision {0!r}'.format(precision))
+        args = (year, month, day, hour, minute, second, microsecond, tzinfo)
+        if fold:
+            # datetime only accepts fold since Python 3.6
+            self = super().__new__(cls, *args, fold=fold)
+        else:
+            self = super().__new__(cls, *args)
+        self.precision = precision
+        return self
+
+    def __reduce_ex__(self, protocol):
+        # datetime's own pickle support would drop the precision
+        return (self.__class__,
+                (self.year, self.month, self.day, self.hour, self.minute,
+                 self.second, self.microsecond, self.tzinfo),
+                {'precision': self.precision})
+
+    def __reduce__(self):
+        return self.__reduce_ex__(2)
+
+    def __setstate__(self, state):
+        self.precision = state['precision']
+
+    def __repr__(self):
+        return '{0}({1}, precision={2!r})'.format(
+            self.__class__.__name__, self.isoformat(), self.precision)
+
+    @property
+    def end(self):
+        """Last instant of the date's period (:class:`datetime.datetime`).
+
+        For example, the end of ``2014-05`` is 2014-05-31 23:59:59.999999.
+        """
+        start = datetime.datetime(self.year, self.month, self.day,
+                                  self.hour, self.minute, self.second,
+                                  tzinfo=self.tzinfo)
+        if self.precision == 'year':
+            following = start.replace(year=self.year + 1, month=1, day=1)
+        elif self.precision == 'month':
+            if self.month == 12:
+                following = start.replace(year=self.year + 1, month=1, day=1)
+            else:
+                following = start.replace(month=self.month + 1, day=1)
+        elif self.precision == 'day':
+            following = start + datetime.timedelta(days=1)
+        elif self.precision == 'minute':
+            following = start + datetime.timedelta(minutes=1)
+        else:
+            following = start + datetime.timedelta(seconds=1)
+        return following - datetime.timedelta(microseconds=1)
+
+    @property
+    def parts(self):
+        """The known date parts: ``(year,)``, ``(year, month)`` or
+        ``(year, month, day)`` (`tuple` of `int`).
+        """
+        if self.precision == 'year':
+            return (self.year,)
+        elif self.precision == 'month':
+            return (self.year, self.month)
+        return (self.year, self.month, self.day)
+
+
+_DATE_PATTERN = re.compile(
+    r'^(\d{4})(?:-(\d{2})(?:-(\d{2})'
+    r'(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?'
+    r'(Z|[+-]\d{2}:?\d{2})?)?)?)?$')
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(text):
+    """Parse a DataCite date.
+
+    Dates may be given as ``YYYY``, ``YYYY-MM``, ``YYYY-MM-DD`` or a full
+    ISO 8601 timestamp. The result starts at the beginning of the period
+    (missing months and days are ``1``) and records the date's precision.
+    Timestamps with a UTC offset are converted to (naive) UTC. For a date
+    range (``start/end``) the start date is returned, or the end date for an
+    open-started range (``/end``).
+
+    Examples
+    --------
+    >>> parse_date('2014')
+    DataciteDate(2014-01-01T00:00:00, precision='year')
+    >>> parse_date('2014-05-26').end
+    datetime.datetime(2014, 5, 26, 23, 59, 59, 999999)
+
+    Parameters
+    ----------
+    text : str
+        Date text.
+
+    Returns
+    -------
+    date : :class:`DataciteDate`
+        The parsed date.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``text`` isn't a recognized date.
+    """
+    value = text.strip()
+    if '/' in value:
+        start, _, end = value.partition('/')
+        value = start.strip() or end.strip()
+
+    match = _DATE_PATTERN.match(value)
+    if match is None:
+        raise ValueError('Unrecognized date {0!r}'.format(text))
+    year, month, day, hour, minute, second, offset = match.groups()
+    if second is not None:
+        precision = 'second'
+    elif minute is not None:
+        precision = 'minute'
+    elif day is not None:
+        precision = 'day'
+    elif month is not None:
+        precision = 'month'
+    else:
+        precision = 'year'
+    date = datetime.datetime(int(year), int(month or 1), int(day or 1),
+                             int(hour or 0), int(minute or 0),
+                             int(second or 0))
+    if offset and offset != 'Z':
+        sign = -1 if offset[0] == '-' else 1
+        digits = offset[1:].replace(':', '')
+        delta = datetime.timedelta(hours=int(digits[:2]),
+                                   minutes=int(digits[2:]))
+        date -= sign * delta
+    return DataciteDate(date.year, date.month, date.day, date.hour,
+                        date.minute, date.second, precision=precision)
+
+
+def to_datetime(value):
+    """Coerce a date-like value to a naive UTC :class:`datetime.datetime`.
+
+    Parameters
+    ----------
+    value : :class:`datetime.datetime`, :class:`datetime.date` or str
+        A date. Strings are parsed with :func:`parse_date`, and
+        :class:`datetime.date`\ s become :class:`DataciteDate`\ s with
+        ``'day'`` precision. Timezone-aware datetimes are converted to naive
+        UTC, like timestamps parsed by :func:`parse_date`.
+
+    Returns
+    -------
+    date : :class:`datetime.datetime`
+        The start of the date's period.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None and value.utcoffset() is not None:
+            value = value.astimezone(datetime.timezone.utc)
+            value = value.replace(tzinfo=None)
+        return value
+    if isinstance(value, datetime.date):
+        return DataciteDate(value.year, value.month, value.day,
+                            precision='day')
+    return parse_date(value)
+
+
+def to_period_end(value):
+    """Get the last instant of a date-like value's period.
+
+    For example, the end of ``'2014'`` is 2014-12-31 23:59:59.999999, and the
+    end of ``datetime.date(2014, 5, 26)`` is 2014-05-26 23:59:59.999999.
+    A :class:`datetime.datetime` without a precision is its own end.
+
+    Parameters
+    ----------
+    value : :class:`datetime.datetime`, :class:`datetime.date` or str
+        A date (see :func:`to_datetime`).
+
+    Returns
+    -------
+    end : :class:`datetime.datetime`
+        The end of the date's period, as naive UTC.
+    """
+    date = to_datetime(value)
+    if isinstance(date, DataciteDate):
+        return date.end
+    return date
+
+
+def date_parts(date):
+    """Get the known parts of a date, as for CSL-JSON ``date-parts``.
+
+    Parameters
+    ----------
+    date : :class:`datetime.datetime`
+        A date. Dates without a recorded precision are treated as having
+        day precision.
+
+    Returns
+    -------
+    parts : tuple
+        ``(year,)``, ``(year, month)`` or ``(year, month, day)``.
+    """
+    if isinstance(date, DataciteDate):
+        return date.parts
+    return (date.year, date.month, date.day)
+
+
+class DateIndex(object):
+    """Items sorted by date, for fast date range queries.
+
+    Range queries bisect the sorted dates, so selecting items between two
+    dates costs :math:`O(\\log n)` comparisons plus the size of the result,
+    rather than a date comparison for every item.
+
+    Items are indexed by the start of their date's period, and range bounds
+    cover their whole period: ``between('2014', '2014')`` selects items
+    dated anywhere in 2014, and ``between(end='2014-05-26')`` includes items
+    dated at any time on May 26.
+
+    Parameters
+    ----------
+    dated_items : iterable
+        ``(date, item)`` pairs, where ``date`` is a
+        :class:`datetime.datetime`. Items with equal dates keep their order.
+    """
+    def __init__(self, dated_items):
+        super().__init__()
+        pairs = sorted(dated_items, key=lambda pair: pair[0])
+        self._dates = [date for date, _ in pairs]
+        self._items = [item for _, item in pairs]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    @property
+    def dates(self):
+        """Sorted `list` of :class:`datetime.datetime` dates."""
+        return list(self._dates)
+
+    def between(self, start=None, end=None):
+        """Get items dated between ``start`` and ``end``, inclusive.
+
+        Parameters
+        ----------
+        start : `datetime.datetime`, `datetime.date` or `str`, optional
+            Earliest date. If `None`, there's no lower bound.
+        end : `datetime.datetime`, `datetime.date` or `str`, optional
+            Latest date; items dated any time up to the end of its period
+            (e.g. the whole day for ``'2014-05-26'``) are included. If
+            `None`, there's no upper bound.
+
+        Returns
+        -------
+        items : list
+            Items in date order.
+        """
+        lo = 0
+        hi = len(self._dates)
+        if start is not None:
+            lo = bisect.bisect_left(self._dates, to_datetime(start))
+        if end is not None:
+            hi = bisect.bisect_right(self._dates, to_period_end(end))
+        return self._items[lo:hi]
+
+    def since(self, start):
+        """Get items dated on or after ``start``, in date order (`list`)."""
+        return self.between(start=start)
+
+    def until(self, end):
+        """Get items dated on or before ``end``, in date order (`list`)."""
+        return self.between(end=end)
@@ -10,6 +10,11 @@ the Zenodo community. Using :class:`~zenodio.harvest.Datecite3Record`\ 's
 members you can access attributes about that record, such as authors, title,
 and DOI.
 
+Zenodo serves record metadata in several OAI-PMH metadata formats. Records
+for each format share the :class:`~zenodio.harvest.BaseRecord` interface;
+see :func:`~zenodio.harvest.select_metadata_format` to pick the most compact
+format that provides the fields you need.
+
 Examples
 --------
 
@@ -19,13 +24,24 @@ Examples
 ...    print(record.title)
 """
 
-import datetime
+import abc
+import bisect
+import collections
+import concurrent.futures
+import hashlib
+import html
+import json
+import re
+import urllib.parse
 
 import requests
 import xmltodict
 
+from .dates import DateIndex, parse_date
+
 
-def harvest_collection(community_name):
+def harvest_collection(community_name, metadata_format=None, fields=None,
+                       archive=None):
     """Harvest a Zenodo community's record metadata.
 
     Examples
@@ -42,10 +58,27 @@ def harvest_collection(community_name):
     generate :class:`~zenodio.harvest.Datacite3Record` objects for individual
     records in the Zenodo collection.
 
+    If you only need some record fields, pass ``fields`` to harvest the
+    smallest metadata format that provides them. For example, a title and
+    DOI-only job can use compact Dublin Core (``oai_dc``) payloads:
+
+    >>> collection = harvest_collection('lsst-dm', fields=['title', 'doi'])
+
     Parameters
     ----------
     community_name : str
         Zenodo community identifier.
+    metadata_format : str, optional
+        OAI-PMH metadata prefix to harvest (see
+        :data:`~zenodio.harvest.METADATA_FORMATS`). Defaults to
+        ``oai_datacite3``, or if ``fields`` is set, the smallest format that
+        provides those fields.
+    fields : iterable of str, optional
+        Names of record properties the caller needs, such as ``'title'``
+        and ``'doi'``. Ignored if ``metadata_format`` is set.
+    archive : :class:`zenodio.archive.PageArchive`, optional
+        If set, each raw OAI-PMH page is saved to this archive so that the
+        harvest can be replayed later without network access.
 
     Returns
     -------
@@ -53,12 +86,107 @@ def harvest_collection(community_name):
         The :class:`~zenodio.harvest.Datacite3Collection` instance with record
         metadata downloaded from Zenodo.
     """
-    url = zenodo_harvest_url(community_name)
-    r = requests.get(url)
-    r.status_code
-    xml_content = r.content
+    if metadata_format is None:
+        if fields is not None:
+            metadata_format = select_metadata_format(fields)
+        else:
+            metadata_format = 'oai_datacite3'
+
+    pages = harvest_pages(community_name, metadata_format=metadata_format,
+                          archive=archive)
+    return Datacite3Collection.from_pages(pages,
+                                          metadata_format=metadata_format)
+
+
+def harvest_pages(community_name, metadata_format='oai_datacite3',
+                  archive=None):
+    """Yield the raw OAI-PMH XML pages of a Zenodo community's records.
+
+    Zenodo splits large ``ListRecords`` responses into pages; this generator
+    follows each page's ``resumptionToken`` until the last page.
+
+    Parameters
+    ----------
+    community_name : str
+        Zenodo community identifier.
+    metadata_format : str, optional
+        OAI-PMH metadata prefix to harvest.
+    archive : :class:`zenodio.archive.PageArchive`, optional
+        If set, each page is saved to this archive as it's downloaded.
+
+    Yields
+    ------
+    xml_content : bytes
+        OAI-PMH ``ListRecords`` XML content for a page.
+    """
+    url = zenodo_harvest_url(community_name, format=metadata_format)
+    token = None
+    harvest_id = archive.new_harvest_id() if archive is not None else None
+    while True:
+        r = requests.get(url)
+        r.raise_for_status()
+        xml_content = r.content
+
+        if archive is not None:
+            archive.append(xml_content, community_name, metadata_format,
+                           resumption_token=token, harvest_id=harvest_id)
+        yield xml_content
+
+        token = resumption_token(xml_content)
+        if not token:
+            break
+        url = zenodo_resume_url(token)
+
+
+def resumption_token(xml_content):
+    """Get the ``resumptionToken`` from an OAI-PMH page.
+
+    Parameters
+    ----------
+    xml_content : bytes or str
+        OAI-PMH ``ListRecords`` XML content.
+
+    Returns
+    -------
+    token : str
+        The resumption token for the next page, or `None` if this is the last
+        page.
+    """
+    return _find_element_text(_RESUMPTION_TOKEN_PATTERN, xml_content)
+
+
+def response_date(xml_content):
+    """Get the ``responseDate`` datestamp from an OAI-PMH page.
+
+    Parameters
+    ----------
+    xml_content : bytes or str
+        OAI-PMH XML content.
+
+    Returns
+    -------
+    datestamp : str
+        The UTC datestamp of the response (for example,
+        ``'2015-12-19T19:06:30Z'``), or `None` if it's missing.
+    """
+    return _find_element_text(_RESPONSE_DATE_PATTERN, xml_content)
 
-    return Datacite3Collection.from_collection_xml(xml_content)
+
+def zenodo_resume_url(token):
+    """Build a URL for the next page of a Zenodo ``ListRecords`` harvest.
+
+    Parameters
+    ----------
+    token : str
+        The ``resumptionToken`` from the previous page.
+
+    Returns
+    -------
+    url : str
+        OAI-PMH metadata URL.
+    """
+    return 'http://zenodo.org/oai2d?verb=ListRecords&' \
+           'resumptionToken={0}'.format(urllib.parse.quote(token, safe=''))
 
 
 def zenodo_harvest_url(community_name, format='oai_datacite3'):
@@ -69,8 +197,9 @@ def zenodo_harvest_url(community_name, format='oai_datacite3'):
     community_name : str
         Zenodo community identifier.
     format : str
-        OAI-PMH metadata specification name. See https://zenodo.org/dev.
-        Currently on ``oai_datacite3`` is supported.
+        OAI-PMH metadata specification name. See https://zenodo.org/dev
+        and :data:`~zenodio.harvest.METADATA_FORMATS` for formats that
+        Zenodio can parse.
 
     Returns
     -------
@@ -83,6 +212,123 @@ def zenodo_harvest_url(community_name, format='oai_datacite3'):
                            community=community_name)
 
 
+METADATA_FORMATS = collections.OrderedDict()
+"""Registry of OAI-PMH metadata formats that Zenodio can parse.
+
+Maps metadata prefixes (such as ``'oai_datacite3'``) to
+:class:`~zenodio.harvest.MetadataFormat` entries. Use
+:func:`~zenodio.harvest.register_metadata_format` to add formats.
+"""
+
+MetadataFormat = collections.namedtuple(
+    'MetadataFormat', ['prefix', 'record_class', 'payload_rank'])
+MetadataFormat.__doc__ = """A registered OAI-PMH metadata format.
+
+Attributes
+----------
+prefix : str
+    OAI-PMH metadata prefix, as passed to
+    :func:`~zenodio.harvest.zenodo_harvest_url`.
+record_class : type
+    :class:`~zenodio.harvest.BaseRecord` subclass that parses records in
+    this format.
+payload_rank : int
+    Relative size of the format's payloads; smaller formats have lower
+    ranks. Used by :func:`~zenodio.harvest.select_metadata_format`.
+"""
+
+
+def register_metadata_format(prefix, record_class, payload_rank):
+    """Register a record class for an OAI-PMH metadata format.
+
+    Parameters
+    ----------
+    prefix : str
+        OAI-PMH metadata prefix.
+    record_class : type
+        :class:`~zenodio.harvest.BaseRecord` subclass that parses a
+        ``record`` element in this format.
+    payload_rank : int
+        Relative size of the format's payloads; smaller formats should have
+        lower ranks.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``record_class.fields`` names an attribute the record
+        class doesn't have.
+    """
+    missing = [f for f in record_class.fields
+               if not hasattr(record_class, f)]
+    if missing:
+        raise ValueError('{0} fields are not record attributes: '
+                         '{1}'.format(record_class.__name__,
+                                      ', '.join(sorted(missing))))
+    METADATA_FORMATS[prefix] = MetadataFormat(prefix, record_class,
+                                              payload_rank)
+
+
+def get_record_class(prefix):
+    """Get the record class for a registered metadata format.
+
+    Parameters
+    ----------
+    prefix : str
+        OAI-PMH metadata prefix.
+
+    Returns
+    -------
+    record_class : type
+        :class:`~zenodio.harvest.BaseRecord` subclass for the format.
+
+    Raises
+    ------
+    ValueError
+        Raised if the metadata format isn't registered.
+    """
+    try:
+        return METADATA_FORMATS[prefix].record_class
+    except KeyError:
+        raise ValueError('Unknown metadata format {0!r}; use one of '
+                         '{1}'.format(prefix, ', '.join(METADATA_FORMATS)))
+
+
+def select_metadata_format(fields):
+    """Select the smallest metadata format that provides a set of fields.
+
+    Examples
+    --------
+    >>> select_metadata_format(['title', 'doi'])
+    'oai_dc'
+    >>> select_metadata_format(['title', 'affiliations'])
+    'datacite3'
+
+    Parameters
+    ----------
+    fields : iterable of str
+        Names of record properties the caller needs (see
+        :attr:`BaseRecord.fields`).
+
+    Returns
+    -------
+    prefix : str
+        OAI-PMH metadata prefix of the format with the smallest payloads
+        that provides all ``fields``.
+
+    Raises
+    ------
+    ValueError
+        Raised if no registered format provides all ``fields``.
+    """
+    fields = frozenset(fields)
+    for metadata_format in sorted(METADATA_FORMATS.values(),
+                                  key=lambda f: f.payload_rank):
+        if fields <= metadata_format.record_class.fields:
+            return metadata_format.prefix
+    raise ValueError('No metadata format provides fields: '
+                     '{0}'.format(', '.join(sorted(fields))))
+
+
 class Datacite3Collection(object):
     """Zenodo metadata for a Community collection derived from Datacite v3
     metadata.
@@ -92,15 +338,29 @@ class Datacite3Collection(object):
     from XML obtained from the Zenodo OAI-PMH API. Most likely, users should
     use :func:`~zenodio.harvest.harvest_collection` to build
     a :class:`~zenodio.harvest.Datacite3Collection` for a Community.
+
+    Despite its name, a collection can hold records in any registered
+    metadata format (see :data:`~zenodio.harvest.METADATA_FORMATS`).
+
+    Parameters
+    ----------
+    xml_records : list
+        `dict`-like objects for each ``record`` tag in OAI-PMH XML.
+    metadata_format : str, optional
+        OAI-PMH metadata prefix of the records.
     """
-    def __init__(self, xml_records):
+    def __init__(self, xml_records, metadata_format='oai_datacite3'):
         super().__init__()
         self._xml_records = xml_records
+        self.metadata_format = metadata_format
+        self._record_class = get_record_class(metadata_format)
+        self._records = None
+        self._date_indexes = {}
 
     @classmethod
-    def from_collection_xml(cls, xml_content):
+    def from_collection_xml(cls, xml_content, metadata_format='oai_datacite3'):
         """Build a :class:`~zenodio.harvest.Datacite3Collection` from
-        Datecite3-formatted XML.
+        OAI-PMH XML.
 
         Users should use :func:`zenodio.harvest.harvest_collection` to build a
         :class:`~zenodio.harvest.Datacite3Collection` for a Community.
@@ -108,37 +368,266 @@ class Datacite3Collection(object):
         Parameters
         ----------
         xml_content : str
-            Datacite3-formatted XML content.
+            OAI-PMH ``ListRecords`` XML content.
+        metadata_format : str, optional
+            OAI-PMH metadata prefix of the records in ``xml_content``.
 
         Returns
         -------
         collection : :class:`Datacite3Collection`
             The collection parsed from Zenodo OAI-PMH XML content.
         """
-        xml_dataset = xmltodict.parse(xml_content, process_namespaces=False)
-        # Unwrap the record list when harvesting a collection's datacite 3
-        xml_records = xml_dataset['OAI-PMH']['ListRecords']['record']  # NOQA
-        return cls(xml_records)
+        return cls(_parse_records(xml_content),
+                   metadata_format=metadata_format)
+
+    @classmethod
+    def from_pages(cls, pages, metadata_format='oai_datacite3',
+                   processes=None):
+        """Build a :class:`~zenodio.harvest.Datacite3Collection` from
+        several pages of OAI-PMH XML.
+
+        Parameters
+        ----------
+        pages : iterable
+            OAI-PMH ``ListRecords`` XML content (`bytes` or `str`) for each
+            page, in order.
+        metadata_format : str, optional
+            OAI-PMH metadata prefix of the records in ``pages``.
+        processes : int, optional
+            If set, pages are parsed in parallel across a pool of this many
+            worker processes. By default, pages are parsed in this process.
+
+            If there are fewer pages than processes, large pages are split
+            into byte ranges of whole ``record`` elements so that every
+            worker has something to parse.
+
+        Returns
+        -------
+        collection : :class:`Datacite3Collection`
+            The collection of records from all pages, in page order.
+        """
+        if processes is None:
+            page_records = map(_parse_records, pages)
+            xml_records = [r for records in page_records for r in records]
+            return cls(xml_records, metadata_format=metadata_format)
+
+        pages = list(pages)
+        if len(pages) < processes:
+            chunks_per_page = -(-processes // max(len(pages), 1))
+            pages = [chunk for page in pages
+                     for chunk in _split_page(page, chunks_per_page)]
+        xml_records = _parallel_parse(_parse_compact_records, [pages],
+                                      processes)
+        return cls(xml_records, metadata_format=metadata_format)
 
     def records(self):
         """Yield records from the collection.
 
         Yields
         ------
-        record : :class:`Datacite3Record`
-            The :class:`Datacite3Record` for an individual resource in
-            the Zenodo collection.
+        record : :class:`BaseRecord`
+            The record (a :class:`Datacite3Record` for the default
+            ``oai_datacite3`` format) for an individual resource in the
+            Zenodo collection.
+        """
+        # Records are built once and reused so that their parsed dates and
+        # digests are cached across calls.
+        if self._records is None:
+            self._records = [self._record_class(r) for r in self._xml_records]
+        for record in self._records:
+            yield record
+
+    def date_index(self, date_type='Issued'):
+        """Get the collection's records sorted by a type of date.
+
+        The index is built once per date type and cached.
+
+        Parameters
+        ----------
+        date_type : str, optional
+            DataCite date type, such as ``'Issued'``, ``'Created'`` or
+            ``'Updated'``.
+
+        Returns
+        -------
+        index : :class:`zenodio.dates.DateIndex`
+            Index of records by date. Records without a date of this type
+            aren't included.
+        """
+        if date_type not in self._date_indexes:
+            self._date_indexes[date_type] = DateIndex(
+                (record.dates[date_type], record)
+                for record in self.records()
+                if date_type in record.dates)
+        return self._date_indexes[date_type]
+
+    def sorted_records(self, date_type='Issued', reverse=False):
+        """Get records sorted by a type of date.
+
+        Parameters
+        ----------
+        date_type : str, optional
+            DataCite date type, such as ``'Issued'`` or ``'Updated'``.
+        reverse : bool, optional
+            If `True`, sort the newest records first.
+
+        Returns
+        -------
+        records : list
+            :class:`BaseRecord`\ s with a date of this type, sorted by date.
+        """
+        records = list(self.date_index(date_type))
+        if reverse:
+            records.reverse()
+        return records
+
+    def records_between(self, start=None, end=None, date_type='Issued'):
+        """Get records dated between ``start`` and ``end``, inclusive.
+
+        Examples
+        --------
+        >>> collection.records_between('2014-06-01', '2014-06-30')
+
+        Parameters
+        ----------
+        start : `datetime.datetime`, `datetime.date` or `str`, optional
+            Earliest date. If `None`, there's no lower bound.
+        end : `datetime.datetime`, `datetime.date` or `str`, optional
+            Latest date. If `None`, there's no upper bound.
+        date_type : str, optional
+            DataCite date type, such as ``'Issued'`` or ``'Updated'``.
+
+        Returns
+        -------
+        records : list
+            :class:`BaseRecord`\ s, sorted by date.
         """
-        for record in self._xml_records:
-            yield Datacite3Record(record)
+        return self.date_index(date_type).between(start, end)
 
+    def issued_between(self, start=None, end=None):
+        """Get records issued between ``start`` and ``end``, inclusive
+        (`list`).
 
-class Datacite3Record(object):
+        See :meth:`records_between`.
+        """
+        return self.records_between(start, end, date_type='Issued')
+
+    def updated_since(self, since):
+        """Get records updated on or after ``since`` (`list`).
+
+        See :meth:`records_between`.
+        """
+        return self.records_between(start=since, date_type='Updated')
+
+
+class BaseRecord(object, metaclass=abc.ABCMeta):
+    """Common interface for Zenodo metadata for a single record.
+
+    Subclasses parse a particular OAI-PMH metadata format; each is registered
+    with :func:`~zenodio.harvest.register_metadata_format`. Subclasses must
+    implement every abstract property and method, or they can't be
+    instantiated.
+
+    Parameters
+    ----------
+    xml_dict : :class:`collections.OrderedDict`
+        A `dict`-like object mapping XML content for a single record (i.e.,
+        the contents of the ``record`` tag in OAI-PMH XML). This dict is
+        typically generated from :mod:`xmltodict`.
+    """
+
+    fields = frozenset()
+    """Names of the record properties that this metadata format provides.
+
+    Used by :func:`~zenodio.harvest.select_metadata_format`; every name must
+    be a property of the record class.
+    """
+
+    def __init__(self, xml_dict):
+        super().__init__()
+        self._r = self._unwrap(xml_dict)
+        self._digest = None
+        self._dates = None
+
+    @staticmethod
+    @abc.abstractmethod
+    def _unwrap(xml_dict):
+        """Get the format-specific metadata from a ``record`` dict."""
+        raise NotImplementedError
+
+    @property
+    def digest(self):
+        """SHA-1 hex digest of the record's metadata content (`str`).
+
+        Records with identical metadata have identical digests, which makes
+        the digest a convenient cache key for data derived from the whole
+        record. The digest doesn't depend on the order of keys in the parsed
+        metadata, so records parsed in worker processes (see
+        :meth:`Datacite3Collection.from_pages`) digest identically.
+        """
+        if self._digest is None:
+            content = json.dumps(self._r, separators=(',', ':'),
+                                 sort_keys=True)
+            self._digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        return self._digest
+
+    @property
+    @abc.abstractmethod
+    def authors(self):
+        """List of :class:`~zenodio.harvest.Author`\ s."""
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def doi(self):
+        """Digital object identifier `str`."""
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def title(self):
+        """Title of resource (`str`)."""
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def abstract_html(self):
+        """Abstract text, marked up with HTML (`str`)."""
+        raise NotImplementedError
+
+    @property
+    def dates(self):
+        """Dates of the resource, keyed by DataCite date type (`dict`).
+
+        For example, ``record.dates['Updated']``. Values are
+        :class:`datetime.datetime`\ s parsed by
+        :func:`zenodio.dates.parse_date`. If a date type appears several
+        times, the first date is used. Dates are parsed once, on first access.
+        """
+        if self._dates is None:
+            self._dates = self._parse_dates()
+        return self._dates
+
+    @abc.abstractmethod
+    def _parse_dates(self):
+        """Parse the record's dates into a `dict` keyed by date type."""
+        raise NotImplementedError
+
+    @property
+    def issue_date(self):
+        """Date when the DOI was issued (:class:`datetime.datetime.Datetime`).
+        """
+        return self.dates.get('Issued')
+
+
+class Datacite3Record(BaseRecord):
     """Zenodo metadata for a single record.
 
     Use :class:`~zenodio.harvest.Datacite3Record`\ s to access metadata about a
     record though a convient object properties.
 
+    This class parses the ``oai_datacite3`` metadata format.
+
     Parameters
     ----------
     xml_dict : :class:`collections.OrderedDict`
@@ -146,11 +635,13 @@ class Datacite3Record(object):
         the contents of the ``record`` tag in OAI-PMH XML). This dict is
         typically generated from :mod:`xmltodict`.
     """
-    def __init__(self, xml_dict):
-        super().__init__()
-        # Unwrap the record; may want to add extra robustness to this in case
-        # you can get a record's XML
-        self._r = xml_dict['metadata']['oai_datacite']['payload']['resource']
+
+    fields = frozenset(['authors', 'affiliations', 'doi', 'title',
+                        'abstract_html', 'issue_date', 'dates'])
+
+    @staticmethod
+    def _unwrap(xml_dict):
+        return xml_dict['metadata']['oai_datacite']['payload']['resource']
 
     @property
     def authors(self):
@@ -163,6 +654,25 @@ class Datacite3Record(object):
         authors = [Author.from_xmldict(c) for c in creators]
         return authors
 
+    @property
+    def affiliations(self):
+        """Distinct affiliations of the authors, in order of first appearance
+        (`list` of `str`).
+
+        Unlike :attr:`Author.affiliation`, this includes every affiliation of
+        creators with several (allowed by DataCite v4).
+        """
+        affiliations = []
+        for creator in _pluralize(self._r['creators'], 'creator'):
+            values = creator.get('affiliation') or []
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                value = _text(value)
+                if value and value not in affiliations:
+                    affiliations.append(value)
+        return affiliations
+
     @property
     def doi(self):
         """Digital object identifier `str`."""
@@ -174,7 +684,7 @@ class Datacite3Record(object):
 
         If there are multiple titles, the first title is returned.
         """
-        return _pluralize(self._r['titles'], 'title')[0]
+        return _text(_pluralize(self._r['titles'], 'title')[0])
 
     @property
     def abstract_html(self):
@@ -184,14 +694,118 @@ class Datacite3Record(object):
             if desc['@descriptionType'] == 'Abstract':
                 return desc['#text']
 
+    def _parse_dates(self):
+        dates = {}
+        if not self._r.get('dates'):
+            return dates
+        for date in _pluralize(self._r['dates'], 'date'):
+            date_type = date.get('@dateType')
+            text = _text(date)
+            if date_type in dates or not text:
+                continue
+            try:
+                dates[date_type] = parse_date(text)
+            except ValueError:
+                # Skip free-form dates rather than failing the whole record
+                continue
+        return dates
+
+
+class DataciteResourceRecord(Datacite3Record):
+    """Zenodo metadata for a single record in the ``datacite3`` format.
+
+    The ``datacite3`` format carries the same DataCite v3 ``resource`` as
+    ``oai_datacite3``, without the ``oai_datacite`` envelope.
+    """
+
+    @staticmethod
+    def _unwrap(xml_dict):
+        return xml_dict['metadata']['resource']
+
+
+class Datacite4Record(Datacite3Record):
+    """Zenodo metadata for a single record in the ``oai_datacite`` (DataCite
+    v4) format.
+
+    DataCite v4 shares the structure of v3 for the fields Zenodio reads, but
+    adds attributes (such as ``nameType`` and ``xml:lang``) to several
+    elements and allows multiple affiliations per creator.
+    """
+
+
+class DublinCoreRecord(BaseRecord):
+    """Zenodo metadata for a single record in the ``oai_dc`` (Dublin Core)
+    format.
+
+    Dublin Core payloads are the most compact that Zenodo provides, but
+    authors have names only (no affiliations).
+    """
+
+    fields = frozenset(['authors', 'doi', 'title', 'abstract_html',
+                        'issue_date'])
+
+    @staticmethod
+    def _unwrap(xml_dict):
+        metadata = xml_dict['metadata']
+        dc = metadata.get('oai_dc:dc') or metadata['dc']
+        # Drop the ``dc:`` namespace prefixes from element names
+        return collections.OrderedDict(
+            (k.split(':')[-1], v) for k, v in dc.items())
+
+    def _values(self, key):
+        value = self._r.get(key)
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        return [_text(v) for v in value]
+
     @property
-    def issue_date(self):
-        """Date when the DOI was issued (:class:`datetime.datetime.Datetime`).
+    def authors(self):
+        """List of :class:`~zenodio.harvest.Author`\ s
+        (:class:`zenodio.harvest.Author`).
+
+        Authors correspond to ``dc:creator`` elements.
         """
-        dates = _pluralize(self._r['dates'], 'date')
-        for date in dates:
-            if date['@dateType'] == 'Issued':
-                return datetime.datetime.strptime(date['#text'], '%Y-%m-%d')
+        return [Author(name) for name in self._values('creator')]
+
+    @property
+    def doi(self):
+        """Digital object identifier `str`."""
+        for identifier in self._values('identifier'):
+            match = _DOI_PATTERN.search(identifier)
+            if match is not None:
+                return match.group(0)
+
+    @property
+    def title(self):
+        """Title of resource (`str`).
+
+        If there are multiple titles, the first title is returned.
+        """
+        return self._values('title')[0]
+
+    @property
+    def abstract_html(self):
+        """Abstract text, marked up with HTML (`str`)."""
+        descriptions = self._values('description')
+        if descriptions:
+            return descriptions[0]
+
+    def _parse_dates(self):
+        # Dublin Core has a single, untyped date: the publication date
+        for text in self._values('date'):
+            try:
+                return {'Issued': parse_date(text)}
+            except ValueError:
+                continue
+        return {}
+
+
+register_metadata_format('oai_dc', DublinCoreRecord, 1)
+register_metadata_format('datacite3', DataciteResourceRecord, 2)
+register_metadata_format('oai_datacite3', Datacite3Record, 3)
+register_metadata_format('oai_datacite', Datacite4Record, 4)
 
 
 class Author(object):
@@ -226,8 +840,8 @@ class Author(object):
 
     @classmethod
     def from_xmldict(cls, xml_dict):
-        """Create an `Author` from a datacite3 metadata converted by
-        `xmltodict`.
+        """Create an `Author` from a datacite3 (or datacite4) metadata
+        converted by `xmltodict`.
 
         Parameters
         ----------
@@ -236,11 +850,15 @@ class Author(object):
             the contents of the ``record`` tag in OAI-PMH XML). This dict is
             typically generated from :mod:`xmltodict`.
         """
-        name = xml_dict['creatorName']
+        name = _text(xml_dict['creatorName'])
 
         kwargs = {}
         if 'affiliation' in xml_dict:
-            kwargs['affiliation'] = xml_dict['affiliation']
+            # DataCite v4 allows several affiliations; use the first
+            affiliation = xml_dict['affiliation']
+            if isinstance(affiliation, list):
+                affiliation = affiliation[0]
+            kwargs['affiliation'] = _text(affiliation)
 
         return cls(name, **kwargs)
 
@@ -315,3 +933,114 @@ def _pluralize(value, item_key):
         return [v]
     else:
         return v
+
+
+def _text(value):
+    """Get the text of an element converted by `xmltodict`.
+
+    Elements with attributes are converted to a `dict` with the text under
+    the ``'#text'`` key; elements without attributes are plain strings.
+    """
+    if isinstance(value, dict):
+        return value.get('#text')
+    return value
+
+
+_DOI_PATTERN = re.compile(r'10\.\d{4,}(\.\d+)*/\S+')
+
+
+def _parse_records(xml_content, dict_constructor=collections.OrderedDict):
+    """Parse the list of ``record`` dicts from an OAI-PMH ``ListRecords``
+    page.
+    """
+    xml_dataset = xmltodict.parse(xml_content, process_namespaces=False,
+                                  dict_constructor=dict_constructor)
+    # Unwrap the record list when harvesting a collection
+    list_records = xml_dataset['OAI-PMH'].get('ListRecords') or {}
+    if 'record' not in list_records:
+        return []
+    return _pluralize(list_records, 'record')
+
+
+def _parse_compact_records(xml_content):
+    """Parse ``record`` dicts in a worker process.
+
+    Plain `dict`\ s are quicker to build and to unpickle than
+    :class:`collections.OrderedDict`\ s, which matters when every record
+    crosses a process boundary. Before Python 3.7, plain `dict`\ s don't
+    preserve key order, but nothing reads records by key order:
+    :attr:`BaseRecord.digest` sorts keys, and repeated elements are lists.
+    """
+    return _parse_records(xml_content, dict_constructor=dict)
+
+
+def _parallel_parse(func, iterables, processes):
+    """Map a page parsing function across a process pool and concatenate
+    the records, in order.
+    """
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        page_records = executor.map(func, *iterables)
+        return [r for records in page_records for r in records]
+
+
+def _split_page(xml_content, n_chunks):
+    """Split an OAI-PMH page into byte ranges of whole ``record`` elements.
+
+    Each chunk is a well-formed OAI-PMH document: the page's prolog (up to
+    the first ``record``) and closing tags wrap a contiguous run of records
+    of roughly ``1 / n_chunks`` of the page's bytes.
+
+    Parameters
+    ----------
+    xml_content : bytes or str
+        OAI-PMH ``ListRecords`` XML content.
+    n_chunks : int
+        Maximum number of chunks.
+
+    Returns
+    -------
+    chunks : list
+        XML content (`bytes`) for each chunk, in order.
+    """
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode('utf-8')
+    starts = [m.start() for m in _RECORD_START_PATTERN.finditer(xml_content)]
+    if n_chunks < 2 or len(starts) < 2:
+        return [xml_content]
+    end = xml_content.rindex(b'</record>') + len(b'</record>')
+    head = xml_content[:starts[0]]
+    tail = b'</ListRecords></OAI-PMH>'
+
+    # Cut at the first record starting past each evenly-spaced byte target
+    size = end - starts[0]
+    cuts = [starts[0]]
+    for k in range(1, n_chunks):
+        target = starts[0] + size * k // n_chunks
+        cut = starts[min(bisect.bisect_left(starts, target),
+                         len(starts) - 1)]
+        if cut > cuts[-1]:
+            cuts.append(cut)
+    cuts.append(end)
+    return [head + xml_content[a:b] + tail for a, b in zip(cuts, cuts[1:])]
+
+
+_RECORD_START_PATTERN = re.compile(br'<record>')
+
+_RESUMPTION_TOKEN_PATTERN = re.compile(
+    br'<resumptionToken[^>]*>([^<]*)</resumptionToken>')
+
+_RESPONSE_DATE_PATTERN = re.compile(br'<responseDate>([^<]*)</responseDate>')
+
+
+def _find_element_text(pattern, xml_content):
+    # Regular expressions avoid parsing the whole page just for one element,
+    # so entities in the element's text have to be unescaped here.
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode('utf-8')
+    match = pattern.search(xml_content)
+    if match is None:
+        return None
+    # html.unescape also handles numeric character references (&#38;),
+    # which xml.sax.saxutils.unescape doesn't.
+    text = html.unescape(match.group(1).decode('utf-8'))
+    return text.strip() or None